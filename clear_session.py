@@ -4,15 +4,16 @@ Run this if you encounter color-related errors
 """
 import streamlit as st
 
-# Clear specific problematic keys
-if 'marker_color' in st.session_state:
-    if st.session_state.marker_color.startswith('#'):
-        del st.session_state.marker_color
+if __name__ == "__main__":
+    # Clear specific problematic keys
+    marker_color = st.session_state.get('marker_color')
+    if isinstance(marker_color, str) and marker_color[:1] == '#':
+        st.session_state.pop('marker_color', None)
         print("Cleared hex color value from marker_color")
 
-# Clear all session state (nuclear option)
-# for key in list(st.session_state.keys()):
-#     del st.session_state[key]
-# print("Cleared all session state")
+    # Clear all session state (nuclear option)
+    # for key in list(st.session_state.keys()):
+    #     del st.session_state[key]
+    # print("Cleared all session state")
 
-print("Session state cleared. Please restart the app.")
+    print("Session state cleared. Please restart the app.")
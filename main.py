@@ -3,62 +3,99 @@
 import streamlit as st
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add sitecast package to path
-sys.path.append(str(Path(__file__).parent))
+_HERE = str(Path(__file__).resolve().parent)
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+
+PAGE_CONFIG = {"page_title": "SiteCast", "page_icon": "📍", "layout": "wide"}
+TITLE = "📍 SiteCast"
+SUBTITLE = "Convert Survey Data to BIM in 30 Seconds"
+FOOTER_HTML = (
+    '<hr style="margin:1em 0"/><b>SiteCast Enhanced</b> - '
+    "Convert survey data to BIM-ready IFC files"
+)
 
-from sitecast.utils.session import initialize_session_state
-from sitecast.ui.sidebar import create_sidebar
-from sitecast.ui.upload import create_upload_section
-from sitecast.ui.mapping import create_mapping_section
-try:
-    from sitecast.ui.export import create_export_section
-except ImportError:
-    # Fallback to simple export if ifcopenshell is not available
-    from sitecast.ui.export_simple import create_export_section
+if __name__ == "__main__":
+    # Configure once per script run, before any other Streamlit command.
+    # streamlit_app.py sets it itself since it only imports this module once.
+    st.set_page_config(**PAGE_CONFIG)
+
+
+@st.cache_resource
+def _load_ui():
+    """Import the UI modules once per process instead of on every rerun"""
+    from sitecast.utils.session import initialize_session_state
+    from sitecast.ui.sidebar import create_sidebar
+    from sitecast.ui.upload import create_upload_section
+    from sitecast.ui.mapping import create_mapping_section
+
+    return SimpleNamespace(
+        initialize_session_state=initialize_session_state,
+        create_sidebar=create_sidebar,
+        create_upload_section=create_upload_section,
+        create_mapping_section=create_mapping_section,
+    )
+
+
+@st.cache_resource
+def _load_export():
+    """Import the export section (and ifcopenshell) only once data is ready"""
+    try:
+        from sitecast.ui.export import create_export_section
+    except ImportError:
+        # Fallback to simple export if ifcopenshell is not available
+        from sitecast.ui.export_simple import create_export_section
+
+    return create_export_section
+
+
+def _render_header():
+    """Render the static page header"""
+    st.title(TITLE)
+    st.subheader(SUBTITLE)
+
+
+def _render_footer():
+    """Render the static page footer"""
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
 
 
 def main():
-    st.set_page_config(page_title="SiteCast", page_icon="📍", layout="wide")
+    ui = _load_ui()
 
     # Initialize session state
-    initialize_session_state()
-
-    # Language selector
-    col1, col2, col3 = st.columns([8, 1, 1])
-    with col2:
-        if st.button("🇳🇴", help="Norsk"):
-            st.info("Norsk oversettelse kommer snart!")
-    with col3:
-        if st.button("🇬🇧", help="English"):
-            pass
+    ui.initialize_session_state()
 
-    st.title("📍 SiteCast")
-    st.subheader("Convert Survey Data to BIM in 30 Seconds")
+    _render_header()
 
     # Create sidebar
-    sidebar_config = create_sidebar()
+    sidebar_config = ui.create_sidebar()
 
     # Main content area
     col1, col2 = st.columns([1, 1])
 
     with col1:
-        uploaded_file = create_upload_section()
+        uploaded_file = ui.create_upload_section()
 
     with col2:
         if uploaded_file is not None:
-            df, errors, warnings = create_mapping_section(uploaded_file, sidebar_config)
+            df, errors, warnings = ui.create_mapping_section(
+                uploaded_file, sidebar_config
+            )
 
             if df is not None and not errors:
                 # Export section
+                create_export_section = _load_export()
                 create_export_section(df, uploaded_file, sidebar_config, warnings)
         else:
             st.header("📊 Column Mapping & Preview")
             st.info("👆 Upload a file and complete column mapping to get started")
 
     # Footer
-    st.markdown("---")
-    st.markdown("**SiteCast Enhanced** - Convert survey data to BIM-ready IFC files")
+    _render_footer()
 
 
 if __name__ == "__main__":
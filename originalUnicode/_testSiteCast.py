@@ -3,18 +3,14 @@ import pandas as pd
 import ifcopenshell
 import uuid
 import io
+from collections import Counter
+from functools import lru_cache
 import tempfile
 import os
+import time
+import traceback
 import numpy as np
 
-# Try to import sklearn for advanced north calculation
-try:
-    from sklearn.decomposition import PCA
-
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-
 # Check if openpyxl is available for Excel support
 try:
     import openpyxl
@@ -60,9 +56,12 @@ class CoordinateValidator:
 
     @staticmethod
     def convert_units(df, from_unit, to_unit="m"):
-        """Convert coordinates between units"""
+        """Convert coordinates between units
+
+        The result may be the input frame itself; treat both as read-only.
+        """
         if from_unit == to_unit:
-            return df.copy()
+            return df
 
         conversion_factors = {
             ("mm", "m"): 0.001,
@@ -75,12 +74,10 @@ class CoordinateValidator:
         if factor is None:
             raise ValueError(f"Conversion from {from_unit} to {to_unit} not supported")
 
-        converted_df = df.copy()
-        for col in ["N", "E", "Z"]:
-            if col in converted_df.columns:
-                converted_df[col] = converted_df[col] * factor
-
-        return converted_df
+        # assign rebuilds only the scaled columns instead of copying the frame
+        return df.assign(
+            **{col: df[col] * factor for col in ["N", "E", "Z"] if col in df.columns}
+        )
 
     @staticmethod
     def validate_coordinates(df):
@@ -143,64 +140,45 @@ class SurveyProcessor:
             return 0.0  # Need at least 3 points for meaningful calculation
 
         try:
-            if SKLEARN_AVAILABLE:
-                # Advanced method using PCA
-                coords = df[["N", "E"]].values
-
-                # Use PCA to find primary orientation of point cloud
-                pca = PCA(n_components=2)
-                pca.fit(coords)
-
-                # First principal component gives primary site orientation
-                primary_direction = pca.components_[0]
-
-                # Calculate angle from east (positive X) to north direction
-                north_angle = np.degrees(
-                    np.arctan2(primary_direction[0], primary_direction[1])
-                )
-
-                return north_angle
-            else:
-                # Simple fallback method using coordinate extents
-                n_coords = df["N"].values
-                e_coords = df["E"].values
-
-                # Find the most northerly and southerly points
-                max_n_idx = np.argmax(n_coords)
-                min_n_idx = np.argmin(n_coords)
-
-                # Calculate direction vector from south to north point
-                dn = n_coords[max_n_idx] - n_coords[min_n_idx]
-                de = e_coords[max_n_idx] - e_coords[min_n_idx]
+            # Primary site orientation is the principal axis of the centred
+            # N/E cloud: the top eigenvector of its 2x2 scatter matrix
+            coords = df[["N", "E"]].to_numpy(dtype=np.float64)
+            coords = coords - coords.mean(axis=0)
+            _, vectors = np.linalg.eigh(coords.T @ coords)
+            primary_direction = vectors[:, -1]
+
+            # Fix the sign as scikit-learn 1.3 PCA does (svd_flip on U): the
+            # point projecting furthest onto the axis lies on its positive side
+            scores = coords @ primary_direction
+            if scores[np.argmax(np.abs(scores))] < 0:
+                primary_direction = -primary_direction
+
+            # Calculate angle from east (positive X) to north direction
+            north_angle = np.degrees(
+                np.arctan2(primary_direction[0], primary_direction[1])
+            )
 
-                # Calculate angle (fallback method)
-                if abs(dn) > 0.001:  # Avoid division by zero
-                    north_angle = np.degrees(np.arctan2(de, dn))
-                    return north_angle
-                else:
-                    return 0.0
+            return north_angle
 
         except Exception as e:
-            if not SKLEARN_AVAILABLE:
-                st.info(
-                    "💡 **Tip**: Install scikit-learn for advanced north calculation: `pip install scikit-learn`"
-                )
-            else:
-                st.warning(f"Could not calculate north direction: {str(e)}")
+            st.warning(f"Could not calculate north direction: {str(e)}")
             return 0.0
 
     def transform_coordinates(self, df):
-        """Apply coordinate transformation based on system type and basepoint"""
-        transformed_df = df.copy()
+        """Apply coordinate transformation based on system type and basepoint
 
+        The result may be the input frame itself; treat both as read-only.
+        """
         if self.coord_system == "Local":
             # For local coordinates, subtract basepoint to get relative coordinates
-            transformed_df["N"] = df["N"] - self.basepoint_n
-            transformed_df["E"] = df["E"] - self.basepoint_e
-            transformed_df["Z"] = df["Z"] - self.basepoint_z
+            return df.assign(
+                N=df["N"] - self.basepoint_n,
+                E=df["E"] - self.basepoint_e,
+                Z=df["Z"] - self.basepoint_z,
+            )
 
         # For Global/Geographic, use coordinates as-is (no transformation)
-        return transformed_df
+        return df
 
 
 def create_excel_template():
@@ -298,8 +276,8 @@ def create_excel_template():
         return None
 
 
-def process_excel_file(uploaded_file):
-    """Process uploaded Excel file"""
+def process_excel_file(uploaded_file, engine=None):
+    """Process uploaded Excel file; pass engine to skip format probing"""
     if not EXCEL_SUPPORT:
         raise Exception(
             "Excel support not available. Please install openpyxl: pip install openpyxl"
@@ -307,12 +285,23 @@ def process_excel_file(uploaded_file):
 
     try:
         # Try to read the Excel file
-        df = pd.read_excel(uploaded_file, sheet_name=0)  # Read first sheet
+        df = pd.read_excel(uploaded_file, sheet_name=0, engine=engine)  # First sheet
         return df
     except Exception as e:
         raise Exception(f"Error reading Excel file: {str(e)}")
 
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def parse_uploaded(name, data, ext):
+    """Parse uploaded CSV/Excel bytes, cached on the file name and content"""
+    if ext == "csv":
+        return pd.read_csv(io.BytesIO(data))
+    # openpyxl reads .xlsx only; let pandas pick the engine for .xls
+    return process_excel_file(
+        io.BytesIO(data), engine="openpyxl" if ext == "xlsx" else None
+    )
+
+
 def smart_parse_kof_file(file_content):
     """Smart parser that attempts to extract coordinate data from any KOF-like format"""
     lines = file_content.strip().split("\n")
@@ -513,6 +502,33 @@ def apply_column_mapping(df, mapping):
     return mapped_df
 
 
+ASSIGNMENT_NAMES = ("Northing", "Easting", "Elevation")
+
+
+@lru_cache(maxsize=32)
+def hex_to_rgb(hex_color):
+    """Convert a "#RRGGBB" color to an (r, g, b) tuple of 0-1 floats"""
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i : i + 2], 16) / 255.0 for i in (0, 2, 4))
+
+
+@lru_cache(maxsize=64)
+def find_duplicate_assignments(assignments):
+    """Return (column, [coordinate names]) for each column assigned more than once
+
+    ``assignments`` is the (N, E, Z) source tuple; reruns with unchanged
+    selectboxes reuse the previous report.
+    """
+    return tuple(
+        (
+            coord,
+            tuple(name for name, x in zip(ASSIGNMENT_NAMES, assignments) if x == coord),
+        )
+        for coord, count in Counter(assignments).items()
+        if count > 1
+    )
+
+
 # --- IFC GENERATION FUNCTIONS ---
 
 
@@ -767,16 +783,33 @@ def create_enhanced_property_set(
 
 
 def verify_ifc_coordinates(ifc_file_path, original_data, offsets):
-    """Verify that IFC coordinates match original data"""
+    """Verify that IFC coordinates match original data
+
+    ifc_file_path may also be an already loaded ifcopenshell.file.
+    """
     try:
-        # Read the IFC file back
-        ifc_file = ifcopenshell.open(ifc_file_path)
+        # Read the IFC file back unless we were handed the model itself
+        if isinstance(ifc_file_path, ifcopenshell.file):
+            ifc_file = ifc_file_path
+        else:
+            ifc_file = ifcopenshell.open(ifc_file_path)
 
         # Find all survey points
         survey_points = ifc_file.by_type("IfcBuildingElementProxy")
 
         verification_results = []
 
+        # Index the original N/E/Z by point ID once (first row wins) instead
+        # of scanning the whole table for every IFC point
+        if "ID" in original_data.columns:
+            original_ids = [str(v) for v in original_data["ID"]]
+        else:
+            original_ids = [""] * len(original_data)
+        original_coords = original_data[["N", "E", "Z"]].to_numpy(dtype=float)
+        original_by_id = {}
+        for original_id, coords in zip(original_ids, original_coords.tolist()):
+            original_by_id.setdefault(original_id, coords)
+
         for point in survey_points:
             if "Survey Point" in (point.Name or ""):
                 # Get local coordinates from placement
@@ -804,16 +837,10 @@ def verify_ifc_coordinates(ifc_file_path, original_data, offsets):
                         )
 
                         # Find matching point in original data
-                        matching_point = None
-                        for _, row in original_data.iterrows():
-                            if str(row.get("ID", "")) == point_id:
-                                matching_point = row
-                                break
+                        matching_point = original_by_id.get(point_id)
 
                         if matching_point is not None:
-                            orig_n = float(matching_point["N"])
-                            orig_e = float(matching_point["E"])
-                            orig_z = float(matching_point["Z"])
+                            orig_n, orig_e, orig_z = matching_point
 
                             # Check if coordinates match (within tolerance)
                             tolerance = 0.001  # 1mm tolerance
@@ -1388,13 +1415,11 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                 # Determine file type and parse accordingly
                 file_extension = uploaded_file.name.split(".")[-1].lower()
 
-                if file_extension == "csv":
-                    # Read CSV
-                    df = pd.read_csv(uploaded_file)
-
-                elif file_extension in ["xlsx", "xls"]:
-                    # Read Excel file
-                    df = process_excel_file(uploaded_file)
+                if file_extension in ["csv", "xlsx", "xls"]:
+                    # Read CSV/Excel, reusing the parse while the upload is unchanged
+                    df = parse_uploaded(
+                        uploaded_file.name, uploaded_file.getvalue(), file_extension
+                    )
 
                 elif file_extension == "kof":
                     # Read KOF file with smart parsing
@@ -1501,19 +1526,9 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                         )
 
                     # Check for duplicate assignments and warn user
-                    assignments = [n_source, e_source, z_source]
-                    assignment_names = ["Northing", "Easting", "Elevation"]
-                    duplicates = []
-                    for i, coord in enumerate(assignments):
-                        if assignments.count(coord) > 1:
-                            indices = [
-                                j for j, x in enumerate(assignments) if x == coord
-                            ]
-                            duplicate_names = [assignment_names[j] for j in indices]
-                            if coord not in [
-                                d[0] for d in duplicates
-                            ]:  # Avoid duplicate warnings
-                                duplicates.append((coord, duplicate_names))
+                    duplicates = find_duplicate_assignments(
+                        (n_source, e_source, z_source)
+                    )
 
                     if duplicates:
                         st.warning("⚠️ **Duplicate Assignments Detected:**")
@@ -1525,24 +1540,21 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
                     # Create mapped dataframe with proper error handling - allow duplicates
                     try:
-                        mapped_df = df.copy()
-
                         # Always assign coordinates, even if duplicated
                         # This allows users to temporarily have the same source for multiple coordinates
-                        if n_source and n_source in df.columns:
-                            mapped_df["N"] = df[n_source].copy()
-                        else:
-                            mapped_df["N"] = 0.0
-
-                        if e_source and e_source in df.columns:
-                            mapped_df["E"] = df[e_source].copy()
-                        else:
-                            mapped_df["E"] = 0.0
-
-                        if z_source and z_source in df.columns:
-                            mapped_df["Z"] = df[z_source].copy()
-                        else:
-                            mapped_df["Z"] = 0.0
+                        # assign shares the source columns rather than copying each one
+                        mapped_df = df.assign(
+                            **{
+                                target: df[source]
+                                if source and source in df.columns
+                                else 0.0
+                                for target, source in (
+                                    ("N", n_source),
+                                    ("E", e_source),
+                                    ("Z", z_source),
+                                )
+                            }
+                        )
 
                         # Always ensure we have the required columns
                         required_cols = ["ID", "N", "E", "Z", "Description"]
@@ -1573,10 +1585,8 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
                         # Use data editor for editing - with robust column checking
                         if all(col in mapped_df.columns for col in required_cols):
-                            # Create a clean copy for editing to avoid reference issues
-                            edit_data = (
-                                mapped_df[required_cols].copy().reset_index(drop=True)
-                            )
+                            # Column selection + reset_index already give a new frame
+                            edit_data = mapped_df[required_cols].reset_index(drop=True)
 
                             edited_df = st.data_editor(
                                 edit_data,
@@ -1601,8 +1611,9 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                                 },
                             )
 
-                            # Update df for further processing
-                            df = edited_df.copy()
+                            # Update df for further processing; data_editor returns
+                            # a fresh frame and nothing below mutates it in place
+                            df = edited_df
                             st.session_state.mapped_df = df
                         else:
                             st.error(
@@ -1770,16 +1781,25 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                                 )
                                 conversion_note = f" (converted from {working_units})"
                             else:
-                                df_meters = df.copy()
+                                # Read-only below, so share the frame
+                                df_meters = df
                                 conversion_note = ""
 
                             # Show coordinate sample for verification
                             st.info("📋 **Coordinate Sample** (in meters for IFC):")
                             sample_coords = df_meters[["N", "E", "Z"]].head(3)
-                            for idx, row in sample_coords.iterrows():
-                                st.write(
-                                    f"Point {idx + 1}: N={row['N']:.3f}m, E={row['E']:.3f}m, Z={row['Z']:.3f}m"
-                                )
+                            st.dataframe(
+                                sample_coords.set_axis(
+                                    [f"Point {idx + 1}" for idx in sample_coords.index]
+                                ),
+                                column_config={
+                                    axis: st.column_config.NumberColumn(
+                                        axis, format="%.3f m"
+                                    )
+                                    for axis in "NEZ"
+                                },
+                                use_container_width=True,
+                            )
 
                             if warnings:
                                 st.warning("⚠️ **Coordinate Validation Warnings:**")
@@ -1796,14 +1816,9 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                                 calculated_north = processor.calculate_north_direction(
                                     df_meters
                                 )
-                                if SKLEARN_AVAILABLE:
-                                    st.info(
-                                        f"🧭 **Calculated Grid North**: {calculated_north:.2f}° from east (PCA method)"
-                                    )
-                                else:
-                                    st.info(
-                                        f"🧭 **Estimated Grid North**: {calculated_north:.2f}° from east (basic method)"
-                                    )
+                                st.info(
+                                    f"🧭 **Calculated Grid North**: {calculated_north:.2f}° from east (PCA method)"
+                                )
 
                             # Apply coordinate transformation
                             if coord_system == "Local" or use_basepoint:
@@ -1812,7 +1827,7 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                                 )
                                 coord_note = f" (offset by basepoint: N={basepoint_n:.3f}, E={basepoint_e:.3f}, Z={basepoint_z:.3f})"
                             else:
-                                transformed_df = df_meters.copy()
+                                transformed_df = df_meters
                                 coord_note = " (global coordinates)"
 
                             # Show preview - always show table even during mapping changes
@@ -1871,18 +1886,19 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
                             # Coordinate system info
                             try:
-                                if (
-                                    pd.api.types.is_numeric_dtype(transformed_df["N"])
-                                    and pd.api.types.is_numeric_dtype(
-                                        transformed_df["E"]
-                                    )
-                                    and pd.api.types.is_numeric_dtype(
-                                        transformed_df["Z"]
+                                # Validation already rejected non-numeric N/E/Z;
+                                # one min and one max over the block, no per-column
+                                # dtype checks. NaN propagates into the extremes
+                                coords = transformed_df[["N", "E", "Z"]].to_numpy(
+                                    dtype=float, na_value=np.nan
+                                )
+                                mins = coords.min(axis=0)
+                                maxs = coords.max(axis=0)
+                                if np.isfinite(mins).all() and np.isfinite(maxs).all():
+                                    n_range, e_range, z_range = (
+                                        f"{lo:.2f} to {hi:.2f}"
+                                        for lo, hi in zip(mins.tolist(), maxs.tolist())
                                     )
-                                ):
-                                    n_range = f"{transformed_df['N'].min():.2f} to {transformed_df['N'].max():.2f}"
-                                    e_range = f"{transformed_df['E'].min():.2f} to {transformed_df['E'].max():.2f}"
-                                    z_range = f"{transformed_df['Z'].min():.2f} to {transformed_df['Z'].max():.2f}"
                                     st.info(
                                         f"📍 **{coord_system} Coordinate Ranges** (meters){coord_note}\nN: {n_range}m\nE: {e_range}m\nZ: {z_range}m"
                                     )
@@ -1893,8 +1909,6 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
             except Exception as e:
                 st.error(f"Error processing file: {str(e)}")
-                import traceback
-
                 st.code(traceback.format_exc())
         else:
             st.info("👆 Upload a file and complete column mapping to get started")
@@ -1910,8 +1924,7 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
         st.header("🚀 Generate IFC File")
 
         # Convert hex color to RGB
-        hex_color = marker_color.lstrip("#")
-        rgb_color = tuple(int(hex_color[i : i + 2], 16) / 255.0 for i in (0, 2, 4))
+        rgb_color = hex_to_rgb(marker_color)
 
         # Generate IFC button
         # Generate IFC button
@@ -1996,30 +2009,31 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                 progress_bar.progress(40)
 
                 total_points = len(transformed_df)
-                for idx, row in transformed_df.iterrows():
-                    # Update progress for each point
-                    point_progress = 40 + int((idx / total_points) * 30)  # 40-70% range
-                    progress_bar.progress(point_progress)
-                    status_text.text(
-                        f"Creating survey point {idx + 1} of {total_points}..."
-                    )
-
-                    point_data = row.to_dict()
+                offsets = {"N": basepoint_n, "E": basepoint_e, "Z": basepoint_z}
+
+                # Pull all rows out once instead of building a Series per row
+                point_records = transformed_df.to_dict("records")
+                local_array = transformed_df[["N", "E", "Z"]].to_numpy(dtype=float)
+                # Original coordinates in meters; transformed_df is derived
+                # from df_meters row for row, so positions already line up
+                original_array = df_meters[["N", "E", "Z"]].to_numpy(dtype=float)
+
+                # Redraw the progress bar about 50 times, not once per point
+                progress_step = max(1, total_points // 50)
+
+                for i, (point_data, local_row, original_row) in enumerate(
+                    zip(point_records, local_array.tolist(), original_array.tolist())
+                ):
+                    if i % progress_step == 0:
+                        point_progress = 40 + int((i / total_points) * 30)  # 40-70% range
+                        progress_bar.progress(point_progress)
+                        status_text.text(
+                            f"Creating survey point {i + 1} of {total_points}..."
+                        )
 
                     # Prepare coordinate data for the enhanced function
-                    original_coords = {
-                        "N": df_meters.loc[idx, "N"],  # Original coordinates in meters
-                        "E": df_meters.loc[idx, "E"],
-                        "Z": df_meters.loc[idx, "Z"],
-                    }
-
-                    local_coords = {
-                        "N": row["N"],  # Transformed coordinates
-                        "E": row["E"],
-                        "Z": row["Z"],
-                    }
-
-                    offsets = {"N": basepoint_n, "E": basepoint_e, "Z": basepoint_z}
+                    original_coords = dict(zip("NEZ", original_row))
+                    local_coords = dict(zip("NEZ", local_row))  # Transformed coordinates
 
                     create_enhanced_survey_point(
                         file,
@@ -2065,8 +2079,6 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                         progress_bar.progress(90)
 
                         # Add timing and debug info
-                        import time
-
                         verification_start = time.time()
 
                         st.info("🔍 **Starting coordinate verification...**")
@@ -2078,8 +2090,9 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
                         else:
                             st.error("❌ IFC file not found for verification!")
 
+                        # Reuse the model we just wrote instead of re-parsing it
                         verification_results = verify_ifc_coordinates(
-                            tmp_file_path,
+                            file,
                             df_meters,  # Use the original meter-converted data
                             offsets,
                         )
@@ -2105,20 +2118,27 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
                                 # Let's debug what's actually in the IFC file
                                 try:
-                                    debug_ifc = ifcopenshell.open(tmp_file_path)
-                                    all_elements = debug_ifc.by_type(
+                                    all_elements = file.by_type(
                                         "IfcBuildingElementProxy"
                                     )
                                     st.info(
                                         f"🔍 Debug: Found {len(all_elements)} IfcBuildingElementProxy elements"
                                     )
 
-                                    for i, elem in enumerate(
-                                        all_elements[:5]
-                                    ):  # Show first 5
-                                        st.info(
-                                            f"Element {i + 1}: Name='{elem.Name}', Description='{elem.Description}'"
-                                        )
+                                    # Show the first 5 as one table
+                                    st.dataframe(
+                                        pd.DataFrame(
+                                            [
+                                                {
+                                                    "Name": elem.Name,
+                                                    "Description": elem.Description,
+                                                }
+                                                for elem in all_elements[:5]
+                                            ],
+                                            index=range(1, min(len(all_elements), 5) + 1),
+                                        ),
+                                        use_container_width=True,
+                                    )
 
                                 except Exception as e:
                                     st.error(f"Debug failed: {e}")
@@ -2129,8 +2149,6 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
                 finally:
                     # Clean up - try multiple times if needed (Windows file locking)
-                    import time
-
                     for attempt in range(3):
                         try:
                             if os.path.exists(tmp_file_path):
@@ -2247,8 +2265,6 @@ SP003,82673.960,1194233.405,2.286,Benchmark""")
 
             except Exception as e:
                 st.error(f"Error generating IFC file: {str(e)}")
-                import traceback
-
                 st.code(traceback.format_exc())
 
     elif "uploaded_file" in locals() and uploaded_file is not None:
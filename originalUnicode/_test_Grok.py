@@ -2,12 +2,12 @@ import streamlit as st
 import pandas as pd
 import ifcopenshell
 import ifcopenshell.api
+import ifcopenshell.guid
 import uuid
 import io
-import tempfile
-import os
 import re
 import logging
+import numpy as np
 import plotly.express as px
 from typing import Tuple, Optional, Dict, List
 
@@ -49,6 +49,22 @@ TRANSLATIONS = {
     },
 }
 
+# Static page content, built once instead of on every rerun
+PROGRESS_STEPS = ("Upload", "Settings", "Data Ready")
+FORMAT_EXAMPLES = (
+    "**CSV Example:**\n```ID,X,Y,Z\nSP001,100.5,200.3,10.2```\n\n"
+    "**KOF Example:**\n```05 AEP4 1194257.404 82692.090 2.075```"
+)
+
+# 03/05 KOF coordinate line (ID and three coordinates), matched across the
+# whole file; [^\S\n] is whitespace that stays within a line, and the outer
+# anchors take the place of stripping each line
+_KOF_PATTERN = re.compile(
+    r"^[^\S\n]*((?:03|05)[^\S\n]+(\w+)[^\S\n]+([\d.]+)[^\S\n]+([\d.]+)"
+    r"[^\S\n]+([\d.]+)(?:.*\S)?)[^\S\n]*$",
+    re.MULTILINE,
+)
+
 # Check for openpyxl
 try:
     import openpyxl
@@ -87,66 +103,88 @@ def create_excel_template() -> Optional[bytes]:
     return output.getvalue()
 
 
-@st.cache_data
-def parse_kof_file(file_content: str) -> List[Dict]:
-    """Parse KOF file using regex for efficiency."""
-    pattern = re.compile(r"^(?:03|05)\s+(\w+)\s+([\d.]+)\s+([\d.]+)\s+([\d.]+)")
-    parsed_data = []
-    for line_num, line in enumerate(file_content.strip().split("\n"), 1):
-        if not line.strip() or line.strip().startswith("-"):
-            continue
-        if match := pattern.match(line.strip()):
-            parsed_data.append(
-                {
-                    "line_num": line_num,
-                    "original_line": line.strip(),
-                    "coord1": float(match.group(2)),
-                    "coord2": float(match.group(3)),
-                    "coord3": float(match.group(4)),
-                    "potential_id": match.group(1),
-                    "description": "",
-                }
-            )
-    return parsed_data
+@st.cache_data(max_entries=16, show_spinner=False)
+def _read_csv(data: bytes) -> pd.DataFrame:
+    """Read uploaded CSV bytes, cached on the content."""
+    return pd.read_csv(io.BytesIO(data))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _read_excel(data: bytes) -> pd.DataFrame:
+    """Read the first sheet of uploaded Excel bytes, cached on the content."""
+    return pd.read_excel(io.BytesIO(data), sheet_name=0)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def parse_kof_file(file_content: str) -> pd.DataFrame:
+    """Parse KOF file using regex for efficiency.
+
+    One regex scan over the whole text finds the 03/05 coordinate lines;
+    returns one row per line with line_num, original_line, coord1-3,
+    potential_id and description.
+    """
+    content = file_content.strip()
+    starts = []
+    rows = []
+    for match in _KOF_PATTERN.finditer(content):
+        starts.append(match.start())
+        rows.append(match.groups())
+    parsed = pd.DataFrame(
+        rows, columns=["original_line", "potential_id", "coord1", "coord2", "coord3"]
+    )
+    # Line numbers from the match offsets against the newline positions
+    newlines = np.flatnonzero(
+        np.frombuffer(content.encode("utf-32-le"), dtype=np.uint32) == 10
+    )
+    parsed.insert(0, "line_num", np.searchsorted(newlines, starts) + 1)
+    coord_cols = ["coord1", "coord2", "coord3"]
+    parsed[coord_cols] = parsed[coord_cols].astype(np.float64)
+    parsed["description"] = ""
+    return parsed
 
 
-def create_editable_table(parsed_data: List[Dict]) -> pd.DataFrame:
+def create_editable_table(parsed_data: pd.DataFrame) -> pd.DataFrame:
     """Create an editable DataFrame from parsed KOF data."""
-    table_data = [
-        {
-            "ID": data["potential_id"] if data["potential_id"] else f"P{i + 1}",
-            "Coord1": data["coord1"],
-            "Coord2": data["coord2"],
-            "Coord3": data["coord3"],
-            "Description": data["description"],
+    table = parsed_data.rename(
+        columns={
+            "potential_id": "ID",
+            "coord1": "Coord1",
+            "coord2": "Coord2",
+            "coord3": "Coord3",
+            "description": "Description",
         }
-        for i, data in enumerate(parsed_data)
-    ]
-    return pd.DataFrame(table_data)
+    )[["ID", "Coord1", "Coord2", "Coord3", "Description"]]
+    # Fall back to P<n> for points without an ID
+    missing = table["ID"] == ""
+    if missing.any():
+        table.loc[missing, "ID"] = [f"P{i + 1}" for i in np.flatnonzero(missing)]
+    return table
+
+
+# Header names recognised per standard column, in order of preference
+COLUMN_PATTERNS = {
+    "ID": ["ID", "POINT_ID", "NAME"],
+    "X": ["X", "EASTING", "E", "EAST"],
+    "Y": ["Y", "NORTHING", "N", "NORTH"],
+    "Z": ["Z", "ELEVATION", "ELEV", "HEIGHT"],
+}
 
 
 def detect_coordinate_columns(df: pd.DataFrame) -> Dict[str, str]:
     """Detect coordinate columns based on common naming patterns."""
-    columns = [col.upper() for col in df.columns]
-    x_patterns = ["X", "EASTING", "E", "EAST"]
-    y_patterns = ["Y", "NORTHING", "N", "NORTH"]
-    z_patterns = ["Z", "ELEVATION", "ELEV", "HEIGHT"]
-    id_patterns = ["ID", "POINT_ID", "NAME"]
+    # Upper-cased name -> first original column with that name
+    upper_map = {}
+    for col in df.columns:
+        upper_map.setdefault(col.upper(), col)
     mapping = {}
-    for col, patterns in [
-        ("ID", id_patterns),
-        ("X", x_patterns),
-        ("Y", y_patterns),
-        ("Z", z_patterns),
-    ]:
+    for col, patterns in COLUMN_PATTERNS.items():
         for pattern in patterns:
-            matches = [c for c in df.columns if c.upper() == pattern]
-            if matches:
-                mapping[col] = matches[0]
+            if pattern in upper_map:
+                mapping[col] = upper_map[pattern]
                 break
-    if "ID" not in mapping and df.columns:
+    if "ID" not in mapping and len(df.columns):
         mapping["ID"] = df.columns[0]
-    if "X" not in mapping and df.columns:
+    if "X" not in mapping and len(df.columns):
         mapping["X"] = df.columns[0]
     if "Y" not in mapping and len(df.columns) > 1:
         mapping["Y"] = df.columns[1]
@@ -157,10 +195,14 @@ def detect_coordinate_columns(df: pd.DataFrame) -> Dict[str, str]:
 
 def apply_column_mapping(df: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
     """Apply column mapping to standardize DataFrame."""
-    mapped_df = pd.DataFrame()
-    for standard_col, source_col in mapping.items():
-        if source_col and source_col in df.columns:
-            mapped_df[standard_col] = df[source_col]
+    # Build the frame in one go rather than adding columns one at a time
+    mapped_df = pd.DataFrame(
+        {
+            standard_col: df[source_col]
+            for standard_col, source_col in mapping.items()
+            if source_col and source_col in df.columns
+        }
+    )
     if "ID" not in mapped_df.columns:
         mapped_df["ID"] = [f"P{i + 1}" for i in range(len(df))]
     if "Description" not in mapped_df.columns:
@@ -168,17 +210,11 @@ def apply_column_mapping(df: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFr
     return mapped_df
 
 
-def create_ifc_file(
-    project_name: str,
-    site_name: str,
-    building_name: str,
-    storey_name: str,
-    coord_system: str,
-    basepoint_x: float,
-    basepoint_y: float,
-    basepoint_z: float,
-) -> Tuple:
-    """Create an IFC file with project hierarchy and coordinate system context."""
+@st.cache_data(max_entries=4, show_spinner=False)
+def _build_skeleton(
+    project_name: str, site_name: str, building_name: str, storey_name: str
+) -> str:
+    """Build the project hierarchy once per set of names, as STEP text."""
     file = ifcopenshell.file(schema="IFC4")
     project = ifcopenshell.api.run(
         "root.create_entity", file, ifc_class="IfcProject", name=project_name
@@ -188,11 +224,6 @@ def create_ifc_file(
         file,
         units=[{"type": "IfcSIUnit", "UnitType": "LENGTHUNIT", "Name": "METRE"}],
     )
-    world_origin = (
-        (basepoint_x, basepoint_y, basepoint_z)
-        if coord_system == "Local"
-        else (0.0, 0.0, 0.0)
-    )
     context = ifcopenshell.api.run(
         "context.add_context",
         file,
@@ -227,34 +258,64 @@ def create_ifc_file(
     ifcopenshell.api.run(
         "aggregate.assign_object", file, relating_object=building, related_object=storey
     )
+    return file.to_string()
+
+
+def create_ifc_file(
+    project_name: str,
+    site_name: str,
+    building_name: str,
+    storey_name: str,
+    coord_system: str,
+    basepoint_x: float,
+    basepoint_y: float,
+    basepoint_z: float,
+) -> Tuple:
+    """Create an IFC file with project hierarchy and coordinate system context."""
+    # The hierarchy only depends on the names; copy the cached skeleton so
+    # the points of this run are added to a fresh file
+    file = ifcopenshell.file.from_string(
+        _build_skeleton(project_name, site_name, building_name, storey_name)
+    )
+    storey = file.by_type("IfcBuildingStorey")[0]
+    body_context = file.by_type("IfcGeometricRepresentationSubContext")[0]
     return file, storey, body_context
 
 
-def create_survey_point(
-    file, storey, context, point_data: Dict, material, creator_name: str
-) -> None:
-    """Create a survey point as a cone in the IFC file."""
-    x, y, z = (
-        float(point_data.get("X", 0)),
-        float(point_data.get("Y", 0)),
-        float(point_data.get("Z", 0)),
+def create_cone_parts(file) -> Tuple:
+    """Create the profile, placement and direction shared by all point cones."""
+    profile = file.create_entity("IfcCircleProfileDef", ProfileType="AREA", Radius=0.2)
+    position = file.create_entity(
+        "IfcAxis2Placement3D",
+        Location=file.create_entity("IfcCartesianPoint", Coordinates=(0.0, 0.0, 0.0)),
     )
-    point_id = point_data.get("ID", "Unknown")
-    description = point_data.get("Description", "")
+    direction = file.create_entity("IfcDirection", DirectionRatios=(0.0, 0.0, 1.0))
+    return profile, position, direction
+
+
+def create_survey_point(
+    file,
+    storey,
+    context,
+    x: float,
+    y: float,
+    z: float,
+    point_id: str,
+    description: str,
+    creator_name: str,
+    cone_parts: Optional[Tuple] = None,
+):
+    """Create a survey point as a cone in the IFC file.
+
+    The point is not contained in the storey; pass the returned points to
+    contain_in_storey once all of them have been created.
+    """
+    profile, position, direction = cone_parts or create_cone_parts(file)
     cone = file.create_entity(
         "IfcExtrudedAreaSolid",
-        SweptArea=file.create_entity(
-            "IfcCircleProfileDef", ProfileType="AREA", Radius=0.2
-        ),
-        Position=file.create_entity(
-            "IfcAxis2Placement3D",
-            Location=file.create_entity(
-                "IfcCartesianPoint", Coordinates=(0.0, 0.0, 0.0)
-            ),
-        ),
-        ExtrudedDirection=file.create_entity(
-            "IfcDirection", DirectionRatios=(0.0, 0.0, 1.0)
-        ),
+        SweptArea=profile,
+        Position=position,
+        ExtrudedDirection=direction,
         Depth=0.5,
     )
     shape = ifcopenshell.api.run(
@@ -267,22 +328,15 @@ def create_survey_point(
             "Items": [cone],
         },
     )
-    point = ifcopenshell.api.run(
-        "root.create_entity",
-        file,
-        ifc_class="IfcBuildingElementProxy",
-        name=f"Survey Point {point_id}",
-        description=description,
+    point = file.create_entity(
+        "IfcBuildingElementProxy",
+        GlobalId=ifcopenshell.guid.new(),
+        Name=f"Survey Point {point_id}",
+        Description=description,
     )
     ifcopenshell.api.run(
         "geometry.assign_representation", file, product=point, representation=shape
     )
-    ifcopenshell.api.run(
-        "spatial.assign_container",
-        file,
-        relating_structure=storey,
-        related_element=point,
-    )
     props = [
         {
             "Name": "Created By",
@@ -307,6 +361,18 @@ def create_survey_point(
         name="Survey_Properties",
         properties=props,
     )
+    return point
+
+
+def contain_in_storey(file, storey, points: List) -> None:
+    """Contain all points in the storey with a single relationship."""
+    if points:
+        file.create_entity(
+            "IfcRelContainedInSpatialStructure",
+            GlobalId=ifcopenshell.guid.new(),
+            RelatingStructure=storey,
+            RelatedElements=points,
+        )
 
 
 def apply_coordinate_transformation(
@@ -318,54 +384,79 @@ def apply_coordinate_transformation(
 ) -> pd.DataFrame:
     """Apply coordinate transformation in-place."""
     if coord_system == "Local":
-        df["X"] -= basepoint_x
-        df["Y"] -= basepoint_y
-        df["Z"] -= basepoint_z
+        # Subtract the basepoint from the X/Y/Z block in one array operation
+        # to_numpy may return a read-only view under copy-on-write, so
+        # build the shifted block as a new array instead of in place
+        basepoint = np.array([basepoint_x, basepoint_y, basepoint_z])
+        df[["X", "Y", "Z"]] = df[["X", "Y", "Z"]].to_numpy(dtype=np.float64) - basepoint
     return df
 
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_preview_figure(points: pd.DataFrame):
+    """Build the WebGL scatter preview of the ID/X/Y columns."""
+    return px.scatter(
+        points,
+        x="X",
+        y="Y",
+        text="ID",
+        title="Survey Points Preview",
+        render_mode="webgl",
+    )
+
+
 def handle_error(e: Exception, message: str) -> None:
     """Centralized error handler."""
     logger.error(f"{message}: {str(e)}")
     st.error(f"{message}: {str(e)}")
 
 
+def _set_lang(lang: str) -> None:
+    """Switch the interface language."""
+    st.session_state.lang = lang
+
+
+def _render_header(t: Dict[str, str]) -> None:
+    """Render the title and the progress indicator."""
+    st.title(t["title"])
+    st.subheader(t["subtitle"])
+    if "transformed_df" in st.session_state:
+        done = 2
+    elif "uploaded_file" in st.session_state:
+        done = 1
+    else:
+        done = 0
+    step_cols = st.columns(len(PROGRESS_STEPS))
+    for i, (step_col, step) in enumerate(zip(step_cols, PROGRESS_STEPS)):
+        step_col.markdown(f"**{step}** {'✅' if i < done else ''}")
+
+
 def main():
     st.set_page_config(page_title="SiteCast", page_icon="📍", layout="wide")
 
-    # Language selection
-    lang = st.session_state.get("lang", "en")
+    # Language selection; the callbacks run before the rerun so the new
+    # language is used straight away
     col1, col2 = st.columns([8, 1])
     with col2:
-        if st.button("🇳🇴", help="Norsk"):
-            st.session_state.lang = "no"
-        if st.button("🇬🇧", help="English"):
-            st.session_state.lang = "en"
-
-    t = TRANSLATIONS[lang]
-    st.title(t["title"])
-    st.subheader(t["subtitle"])
+        st.button("🇳🇴", help="Norsk", on_click=_set_lang, args=("no",))
+        st.button("🇬🇧", help="English", on_click=_set_lang, args=("en",))
 
-    # Progress indicator
-    progress_steps = ["Upload", "Settings", "Data Ready"]
-    progress_cols = st.columns(len(progress_steps))
-    for i, step in enumerate(progress_steps):
-        with progress_cols[i]:
-            st.markdown(
-                f"**{step}** {'✅' if i < (2 if 'transformed_df' in st.session_state else 1 if 'uploaded_file' in st.session_state else 0) else ''}"
-            )
+    t = TRANSLATIONS[st.session_state.get("lang", "en")]
+    _render_header(t)
 
     # Step 1: Upload
     st.header(t["step1"])
     with st.expander("Supported Formats"):
-        st.write("**CSV Example:**\n```ID,X,Y,Z\nSP001,100.5,200.3,10.2```")
-        st.write("**KOF Example:**\n```05 AEP4 1194257.404 82692.090 2.075```")
+        st.markdown(FORMAT_EXAMPLES)
 
     uploaded_file = st.file_uploader(
         t["step1"], type=["csv", "kof", "xlsx", "xls"], help=t["help_upload"]
     )
     if EXCEL_SUPPORT:
-        template_file = create_excel_template()
+        # Keep the bytes in the session so reruns skip the cache lookup
+        if "xls_template" not in st.session_state:
+            st.session_state.xls_template = create_excel_template()
+        template_file = st.session_state.xls_template
         if template_file:
             st.download_button(
                 label="📥 Download Excel Template",
@@ -417,13 +508,13 @@ def main():
         try:
             file_extension = uploaded_file.name.split(".")[-1].lower()
             if file_extension == "csv":
-                df = pd.read_csv(uploaded_file)
+                df = _read_csv(uploaded_file.getvalue())
             elif file_extension in ["xlsx", "xls"]:
-                df = pd.read_excel(uploaded_file, sheet_name=0)
+                df = _read_excel(uploaded_file.getvalue())
             elif file_extension == "kof":
-                file_content = uploaded_file.read().decode("utf-8", errors="ignore")
+                file_content = uploaded_file.getvalue().decode("utf-8", errors="ignore")
                 parsed_data = parse_kof_file(file_content)
-                if not parsed_data:
+                if parsed_data.empty:
                     st.error("No valid coordinate data found in KOF file.")
                     st.stop()
                 df = create_editable_table(parsed_data)
@@ -480,9 +571,10 @@ def main():
                 st.error("Missing required columns: ID, X, Y, Z")
                 st.stop()
 
-            # Apply transformation
+            # Apply transformation; df is the fresh frame from
+            # apply_column_mapping, so it can be transformed without a copy
             transformed_df = apply_coordinate_transformation(
-                df.copy(), coord_system, basepoint_x, basepoint_y, basepoint_z
+                df, coord_system, basepoint_x, basepoint_y, basepoint_z
             )
 
             # Data preview
@@ -499,15 +591,9 @@ def main():
                 },
             )
 
-            # Plotly preview
-            if "X" in transformed_df.columns and "Y" in transformed_df.columns:
-                fig = px.scatter(
-                    transformed_df,
-                    x="X",
-                    y="Y",
-                    text="ID",
-                    title="Survey Points Preview",
-                )
+            # Plotly preview, only built when the user asks for it
+            if st.checkbox("Show map preview", value=False):
+                fig = build_preview_figure(transformed_df[["ID", "X", "Y"]])
                 st.plotly_chart(fig, use_container_width=True)
 
             st.session_state.transformed_df = transformed_df
@@ -537,16 +623,34 @@ def main():
                     basepoint_y,
                     basepoint_z,
                 )
-                for _, row in st.session_state.transformed_df.iterrows():
-                    create_survey_point(file, storey, context, row, None, "SiteCast")
-
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=".ifc"
-                ) as tmp_file:
-                    file.write(tmp_file.name)
-                    with open(tmp_file.name, "rb") as f:
-                        ifc_data = f.read()
-                    os.unlink(tmp_file.name)
+                # Pull each column out once and pass plain scalars per point
+                points_df = st.session_state.transformed_df
+                cone_parts = create_cone_parts(file)
+                points = [
+                    create_survey_point(
+                        file,
+                        storey,
+                        context,
+                        x,
+                        y,
+                        z,
+                        point_id,
+                        description,
+                        "SiteCast",
+                        cone_parts,
+                    )
+                    for x, y, z, point_id, description in zip(
+                        points_df["X"].to_numpy(dtype=np.float64).tolist(),
+                        points_df["Y"].to_numpy(dtype=np.float64).tolist(),
+                        points_df["Z"].to_numpy(dtype=np.float64).tolist(),
+                        points_df["ID"].astype(str).tolist(),
+                        points_df["Description"].fillna("").astype(str).tolist(),
+                    )
+                ]
+                contain_in_storey(file, storey, points)
+
+                # Serialize in memory instead of a temp file round-trip
+                ifc_data = file.to_string().encode("utf-8")
 
                 st.success("✅ IFC file generated!")
                 st.download_button(
@@ -132,14 +132,12 @@ class TestCoordinateValidator:
         assert converted_df["Z"].iloc[2] == pytest.approx(9.0)
 
     def test_convert_units_no_conversion(self, sample_coordinate_data):
-        """Test that no conversion returns a copy"""
+        """Test that no conversion returns the input unchanged"""
         validator = CoordinateValidator()
         converted_df = validator.convert_units(sample_coordinate_data, "m", "m")
 
-        # Should be a copy, not the same object
-        assert converted_df is not sample_coordinate_data
-        # But values should be identical
-        pd.testing.assert_frame_equal(converted_df, sample_coordinate_data)
+        # Same units is a no-op, so the frame is returned without copying
+        assert converted_df is sample_coordinate_data
 
     def test_validate_coordinates_success(self, sample_coordinate_data):
         """Test successful coordinate validation"""
@@ -271,6 +269,37 @@ class TestSurveyProcessor:
         assert isinstance(north_angle, (int, float))
         assert -180 <= north_angle <= 180
 
+    def test_calculate_north_direction_pca_sign(self):
+        """The axis points towards the point furthest from the centre, as in PCA"""
+        df = pd.DataFrame({"N": [0.0, 9.0, 10.0], "E": [0.0, 0.01, 0.0]})
+        processor = SurveyProcessor()
+        north_angle = processor.calculate_north_direction(df)
+
+        # Centred N is (-6.33, 2.67, 3.67), so the axis points to -N
+        assert north_angle == pytest.approx(-90.0, abs=0.5)
+
+    def test_convert_and_transform_matches_two_steps(self, sample_coordinate_data):
+        """Test the fused conversion matches convert_units + transform_coordinates"""
+        df_mm = sample_coordinate_data.assign(
+            N=sample_coordinate_data["N"] * 1000,
+            E=sample_coordinate_data["E"] * 1000,
+            Z=sample_coordinate_data["Z"] * 1000,
+        )
+        processor = SurveyProcessor(
+            coord_system="Local",
+            basepoint_n=82000.0,
+            basepoint_e=1194000.0,
+            basepoint_z=0.0,
+        )
+
+        df_meters, transformed_df = processor.convert_and_transform(df_mm, 0.001)
+
+        expected_meters = CoordinateValidator.convert_units(df_mm, "mm", "m")
+        pd.testing.assert_frame_equal(df_meters, expected_meters)
+        pd.testing.assert_frame_equal(
+            transformed_df, processor.transform_coordinates(expected_meters)
+        )
+
 
 # ===== tests/test_parsers.py =====
 """Test the file parsing module"""
@@ -278,6 +307,8 @@ import pytest
 import pandas as pd
 from sitecast.core.parsers import (
     smart_parse_kof_file,
+    smart_parse_kof_stream,
+    parse_kof_table,
     create_editable_coordinate_table,
     detect_coordinate_columns,
     apply_column_mapping,
@@ -424,12 +455,34 @@ class TestParsers:
         assert mapped_df["ID"].iloc[0] == 1
         assert mapped_df["Description"].iloc[0] == ""
 
+    def test_parse_kof_table_matches_editable_table(self, sample_kof_content):
+        """The upload parser builds the same table as parse-then-tabulate"""
+        lines = sample_kof_content.split("\n") + [
+            "",
+            "   ",
+            "05",
+            "09 91 99",
+            "-03 OFF 82000.500 1194000.500 1.250",
+            "05 82690.000 1194250.000 3.100 kum",
+        ]
+        # Already split lines, and lines as read from a text file (with "\n")
+        for batch in (lines, [line + "\n" for line in lines]):
+            expected = create_editable_coordinate_table(
+                list(smart_parse_kof_stream(batch))
+            )
+            pd.testing.assert_frame_equal(parse_kof_table(batch), expected)
+
+        # No coordinate lines at all
+        assert parse_kof_table(["", "05", "-05 X 1 2 3"]) is None
+        assert create_editable_coordinate_table([]) is None
+
 
 # ===== tests/test_ifc_builder.py =====
 """Test IFC file building functionality"""
 import pytest
 import ifcopenshell
-from sitecast.ifc.builder import create_guid, create_ifc_file
+import ifcopenshell.guid
+from sitecast.ifc.builder import bulk_guids, create_guid, create_ifc_file
 
 
 class TestIFCBuilder:
@@ -445,6 +498,23 @@ class TestIFCBuilder:
         # Should be unique
         assert guid1 != guid2
 
+    def test_bulk_guids_are_compressed_uuid4(self):
+        """Batch GlobalIds round-trip through ifcopenshell as version 4 UUIDs"""
+        import uuid
+
+        guids = bulk_guids(2000)
+
+        assert len(guids) == 2000
+        assert len(set(guids)) == len(guids)
+        for guid in guids:
+            assert len(guid) == 22
+            assert guid[0] in "0123"
+            assert ifcopenshell.guid.compress(ifcopenshell.guid.expand(guid)) == guid
+            parsed = uuid.UUID(ifcopenshell.guid.expand(guid))
+            assert parsed.version == 4
+            assert parsed.variant == uuid.RFC_4122
+        assert bulk_guids(0) == []
+
     def test_create_ifc_file(self, sample_config):
         """Test IFC file creation"""
         file, storey, context = create_ifc_file(
@@ -483,6 +553,121 @@ class TestIFCBuilder:
         assert context is not None
         assert context.is_a("IfcGeometricRepresentationSubContext")
 
+    def test_coordination_object_leaves_guid_pool_empty(self, sample_config):
+        """Coordination objects draw GlobalIds without leaving reserved ones"""
+        from sitecast.ifc import builder
+        from sitecast.ui.components import create_coordination_object
+
+        file, storey, context = create_ifc_file(
+            sample_config["project_name"],
+            sample_config["site_name"],
+            sample_config["building_name"],
+            sample_config["storey_name"],
+        )
+        material = file.create_entity("IfcMaterial", Name="Test")
+        pool_size = len(builder._GUID_POOL)
+        contained = []
+        create_coordination_object(
+            file, storey, context, "Origin", 0.0, 0.0, 0.0, material, contained=contained
+        )
+
+        assert len(contained) == 1
+        assert len(builder._GUID_POOL) == pool_size
+
+    def test_survey_points_batch_matches_single_points(
+        self, sample_coordinate_data, sample_config
+    ):
+        """The batch builds the same points as the per-point builder"""
+        import ifcopenshell.util.element
+        from sitecast.core.processors import SurveyProcessor
+        from sitecast.ifc import builder
+        from sitecast.ifc.materials import create_material
+        from sitecast.ui.components import (
+            create_enhanced_survey_point,
+            create_enhanced_survey_points_batch,
+        )
+        from sitecast.utils.verification import verify_ifc_coordinates
+
+        offsets = {
+            "N": sample_config["basepoint_n"],
+            "E": sample_config["basepoint_e"],
+            "Z": sample_config["basepoint_z"],
+        }
+        local_df = SurveyProcessor(
+            "Local", offsets["N"], offsets["E"], offsets["Z"]
+        ).transform_coordinates(sample_coordinate_data)
+        pset_args = (
+            sample_config["pset_name"],
+            sample_config["custom_properties"],
+            "points.csv",
+            sample_config["creator_name"],
+            sample_config["external_link"],
+        )
+
+        def new_file():
+            file, storey, context = create_ifc_file(
+                sample_config["project_name"],
+                sample_config["site_name"],
+                sample_config["building_name"],
+                sample_config["storey_name"],
+            )
+            return file, storey, context, create_material(file, "Red", (1, 0, 0))
+
+        def describe(points):
+            return [
+                (
+                    point.Name,
+                    point.Description,
+                    point.ObjectPlacement.RelativePlacement.Location.Coordinates,
+                    {
+                        pset: {k: v for k, v in props.items() if k != "id"}
+                        for pset, props in ifcopenshell.util.element.get_psets(
+                            point
+                        ).items()
+                    },
+                )
+                for point in points
+            ]
+
+        file, storey, context, material = new_file()
+        batch = create_enhanced_survey_points_batch(
+            file,
+            storey,
+            context,
+            local_df,
+            sample_coordinate_data,
+            material,
+            offsets,
+            *pset_args,
+        )
+
+        single_file, single_storey, single_context, single_material = new_file()
+        singles = [
+            create_enhanced_survey_point(
+                single_file,
+                single_storey,
+                single_context,
+                local,
+                single_material,
+                original,
+                local,
+                offsets,
+                *pset_args,
+            )
+            for local, original in zip(
+                local_df.to_dict("records"),
+                sample_coordinate_data[["N", "E", "Z"]].to_dict("records"),
+            )
+        ]
+
+        assert describe(batch) == describe(singles)
+        for point in batch:
+            assert ifcopenshell.util.element.get_container(point) == storey
+            assert ifcopenshell.util.element.get_material(point) == material
+        results = verify_ifc_coordinates(file, sample_coordinate_data, offsets)
+        assert results["all_match"].all()
+        assert builder._GUID_POOL == []
+
 
 # ===== tests/test_integration.py =====
 """Integration tests for the complete workflow"""
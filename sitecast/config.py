@@ -23,8 +23,6 @@ DEFAULTS = {
     "marker_color": "Red",
     "creator_name": "SiteCast User",
     "external_link": "",
-    "parsed_data": None,
-    "mapped_df": None,
     "pset_name": "NOSC_SiteCast",
     "verify_coordinates": True,
     "custom_properties": [
@@ -1,142 +1,241 @@
 """File parsing functions for various survey data formats"""
 
+import re
+from itertools import chain
+
+import numpy as np
 import pandas as pd
 from ..config import COORDINATE_PATTERNS
 
 
+_KOF_FORMAT_CODES = frozenset(["03", "05", "09", "91", "99"])
+
+# First characters float() can accept; other tokens skip the exception path
+_NUMBER_START = frozenset("0123456789+-.nNiI")
+
+# Lines tokenised before each vectorised filtering pass when streaming
+_KOF_BATCH_LINES = 65536
+
+# Point IDs mix letters and digits, e.g. "AEP4" or "SP02"
+_ID_RE = re.compile(r"(?=.*?[^\W\d_])(?=.*?\d)", re.DOTALL)
+
+
+def _filter_kof_numbers(flat, counts):
+    """Drop format codes from the flattened numbers of a batch of lines
+
+    KOF uses whole numbers 0-99 as format codes, not coordinates. Returns
+    the kept numbers, each line's start/stop in them, and whether the line
+    has at least 3 coordinates and no nan/inf.
+    """
+    ends = np.cumsum(counts)
+    keep = ~((flat == np.floor(flat)) & (flat >= 0) & (flat <= 99))
+    bad = ~np.isfinite(flat)
+
+    # Per-line totals via prefix sums (lines may have no numbers at all)
+    kept_ends = np.concatenate(([0], np.cumsum(keep)))
+    bad_ends = np.concatenate(([0], np.cumsum(bad)))
+    starts = ends - counts
+    kept_start = kept_ends[starts]
+    kept_stop = kept_ends[ends]
+
+    valid = (kept_stop - kept_start >= 3) & (bad_ends[ends] == bad_ends[starts])
+    return flat[keep], kept_start, kept_stop, valid
+
+
 def smart_parse_kof_file(file_content):
     """Smart parser for KOF format files"""
-    lines = file_content.strip().split("\n")
-    parsed_data = []
+    return list(smart_parse_kof_stream(file_content.strip().split("\n")))
+
+
+def smart_parse_kof_stream(lines):
+    """Parse KOF lines lazily from any iterable, e.g. an open text file
+
+    Yields the same dicts as smart_parse_kof_file, filtering lines in
+    batches so the whole file never needs to be in memory at once.
+    """
+    for candidates in _tokenise_kof_lines(lines):
+        yield from _parse_kof_candidates(candidates)
+
+
+def parse_kof_table(lines):
+    """Parse KOF lines straight into the editable coordinate table
+
+    Equivalent to create_editable_coordinate_table(smart_parse_kof_stream(lines))
+    but the coordinate columns are gathered as arrays, without building a
+    dict per line. Returns None when no coordinate lines are found.
+    """
+    ids, coords, descriptions, original_lines = [], [], [], []
+    for candidates in _tokenise_kof_lines(lines):
+        rows, filtered, kept_start = _filter_kof_candidates(candidates)[:3]
+        first = kept_start[rows]
+        coords.append(filtered[np.stack([first, first + 1, first + 2], axis=1)])
+        for i in rows.tolist():
+            line = candidates[i][1]
+            potential_id, description = _split_kof_text(candidates[i][3])
+            ids.append(potential_id or f"P{len(ids) + 1}")
+            descriptions.append(description)
+            original_lines.append(line)
+
+    if not ids:
+        return None
 
-    for line_num, line in enumerate(lines, 1):
-        # Skip empty lines
-        if not line.strip():
-            continue
+    coords = np.concatenate(coords)
+    return pd.DataFrame(
+        {
+            "ID": ids,
+            "Coord1": coords[:, 0],
+            "Coord2": coords[:, 1],
+            "Coord3": coords[:, 2],
+            "Description": descriptions,
+            "Original_Line": original_lines,
+        }
+    )
 
-        # Skip disabled lines (starting with minus)
-        if line.strip().startswith("-"):
-            continue
 
-        # Try to extract numeric data from each line
-        try:
-            parts = line.strip().split()
+def _tokenise_kof_lines(lines):
+    """Split KOF lines into numeric and text tokens, yielding batches"""
+    candidates = []
 
-            # Find all numeric values
-            numeric_values = []
-            text_values = []
+    for line_num, line in enumerate(lines, 1):
+        line = line.strip()
 
-            for part in parts:
+        # Skip empty lines and disabled lines (starting with minus)
+        if not line or line[0] == "-":
+            continue
+
+        # Split tokens into numeric and text values
+        numeric_values = []
+        text_values = []
+        for part in line.split():
+            if part[0] in _NUMBER_START or part[0].isdigit():
                 try:
-                    val = float(part)
-                    numeric_values.append(val)
+                    numeric_values.append(float(part))
+                    continue
                 except ValueError:
-                    text_values.append(part)
+                    pass
+            text_values.append(part)
 
-            # Filter out format codes
-            filtered_coords = []
-            for val in numeric_values:
-                # Skip values that look like format codes
-                if val == int(val) and 0 <= val <= 99:
-                    continue
-                else:
-                    filtered_coords.append(val)
-
-            # Need at least 3 numeric values for coordinates
-            if len(filtered_coords) >= 3:
-                coord1 = filtered_coords[0]  # N
-                coord2 = filtered_coords[1]  # E
-                coord3 = filtered_coords[2]  # Z
-
-                # Try to identify ID from text values
-                potential_id = None
-                description_parts = []
-
-                for text in text_values:
-                    if text in ["03", "05", "09", "91", "99"]:
-                        continue
-                    elif any(c.isalpha() for c in text) and any(
-                        c.isdigit() for c in text
-                    ):
-                        if potential_id is None:
-                            potential_id = text
-                        else:
-                            description_parts.append(text)
-                    else:
-                        description_parts.append(text)
-
-                description = " ".join(description_parts) if description_parts else ""
-
-                parsed_data.append(
-                    {
-                        "line_num": line_num,
-                        "original_line": line.strip(),
-                        "coord1": coord1,
-                        "coord2": coord2,
-                        "coord3": coord3,
-                        "potential_id": potential_id,
-                        "description": description,
-                        "all_numeric": numeric_values,
-                        "filtered_coords": filtered_coords,
-                        "all_text": text_values,
-                    }
-                )
-
-        except Exception:
+        candidates.append((line_num, line, numeric_values, text_values))
+        if len(candidates) >= _KOF_BATCH_LINES:
+            yield candidates
+            candidates = []
+
+    if candidates:
+        yield candidates
+
+
+def _filter_kof_candidates(candidates):
+    """Find the coordinate lines among tokenised candidates
+
+    Returns the indices of valid lines, the numbers left after dropping
+    format codes as one flat array, and each line's start/stop in it.
+    """
+    # Filter format codes for all lines at once over one flat array
+    counts = np.fromiter((len(c[2]) for c in candidates), dtype=np.intp, count=len(candidates))
+    flat = np.fromiter(chain.from_iterable(c[2] for c in candidates), dtype=np.float64, count=counts.sum())
+    kept, kept_start, kept_stop, valid = _filter_kof_numbers(flat, counts)
+    return np.flatnonzero(valid), kept, kept_start, kept_stop
+
+
+def _split_kof_text(text_values):
+    """Pick the point ID from a line's text tokens; the rest is description"""
+    potential_id = None
+    description_parts = []
+
+    for text in text_values:
+        if text in _KOF_FORMAT_CODES:
             continue
+        elif potential_id is None and _ID_RE.match(text):
+            potential_id = text
+        else:
+            description_parts.append(text)
 
-    return parsed_data
+    return potential_id, " ".join(description_parts)
 
 
-def create_editable_coordinate_table(parsed_data):
-    """Create an editable table for coordinate mapping"""
-    if not parsed_data:
-        return None
+def _parse_kof_candidates(candidates):
+    """Turn tokenised candidate lines into parsed coordinate dicts"""
+    rows, filtered, kept_start, kept_stop = _filter_kof_candidates(candidates)
+    filtered = filtered.tolist()
 
-    table_data = []
+    parsed_data = []
+    for i in rows.tolist():
+        line_num, line, numeric_values, text_values = candidates[i]
+        filtered_coords = filtered[kept_start[i] : kept_stop[i]]
 
-    for i, data in enumerate(parsed_data):
-        point_id = data["potential_id"] if data["potential_id"] else f"P{i + 1}"
+        # Try to identify ID from text values
+        potential_id, description = _split_kof_text(text_values)
 
-        table_data.append(
+        parsed_data.append(
             {
-                "ID": point_id,
-                "Coord1": data["coord1"],
-                "Coord2": data["coord2"],
-                "Coord3": data["coord3"],
-                "Description": data["description"],
-                "Original_Line": data["original_line"],
+                "line_num": line_num,
+                "original_line": line,
+                "coord1": filtered_coords[0],  # N
+                "coord2": filtered_coords[1],  # E
+                "coord3": filtered_coords[2],  # Z
+                "potential_id": potential_id,
+                "description": description,
+                "all_numeric": numeric_values,
+                "filtered_coords": filtered_coords,
+                "all_text": text_values,
             }
         )
 
-    return pd.DataFrame(table_data)
+    return parsed_data
+
+
+def create_editable_coordinate_table(parsed_data):
+    """Create an editable table for coordinate mapping"""
+    if not parsed_data:
+        return None
+
+    # Build each column directly instead of one dict per row
+    n = len(parsed_data)
+    return pd.DataFrame(
+        {
+            "ID": [
+                data["potential_id"] or f"P{i + 1}"
+                for i, data in enumerate(parsed_data)
+            ],
+            "Coord1": np.fromiter(
+                (data["coord1"] for data in parsed_data), dtype=np.float64, count=n
+            ),
+            "Coord2": np.fromiter(
+                (data["coord2"] for data in parsed_data), dtype=np.float64, count=n
+            ),
+            "Coord3": np.fromiter(
+                (data["coord3"] for data in parsed_data), dtype=np.float64, count=n
+            ),
+            "Description": [data["description"] for data in parsed_data],
+            "Original_Line": [data["original_line"] for data in parsed_data],
+        }
+    )
 
 
 def detect_coordinate_columns(df):
     """Smart detection of coordinate columns with N,E,Z naming patterns"""
-    columns = [col.upper() for col in df.columns]
+    # Upper-case each header once; keep the first column for duplicates
+    upper = {}
+    for col in df.columns:
+        upper.setdefault(str(col).upper(), col)
+    words = [(col, set(name.replace("_", " ").split())) for name, col in upper.items()]
     mapping = {}
 
-    # Find best matches for each coordinate type
+    # Find best matches for each coordinate type, trying every pattern as an
+    # exact match before falling back to word and then substring matches
     for coord_type, patterns in COORDINATE_PATTERNS.items():
-        for pattern in patterns:
-            # Check for exact matches first
-            matches = [col for col in df.columns if col.upper() == pattern]
-            if matches:
-                mapping[coord_type.upper()] = matches[0]
-                break
-            
-            # Check if pattern is contained in column name (with word boundaries)
-            matches = [col for col in df.columns if pattern in col.upper().replace('_', ' ').split()]
-            if matches:
-                mapping[coord_type.upper()] = matches[0]
-                break
-            
-            # Check if column contains the pattern as substring
-            matches = [col for col in df.columns if pattern in col.upper()]
-            if matches:
-                mapping[coord_type.upper()] = matches[0]
-                break
+        match = next((upper[p] for p in patterns if p in upper), None)
+        if match is None:
+            match = next(
+                (col for p in patterns for col, ws in words if p in ws), None
+            )
+        if match is None:
+            match = next(
+                (col for p in patterns for name, col in upper.items() if p in name),
+                None,
+            )
+        if match is not None:
+            mapping[coord_type.upper()] = match
 
     # Fallback to first available columns if no matches
     available_cols = list(df.columns)
@@ -154,12 +253,16 @@ def detect_coordinate_columns(df):
 
 def apply_column_mapping(df, mapping):
     """Apply column mapping to create standardized DataFrame"""
-    mapped_df = pd.DataFrame()
-
-    # Apply mappings
-    for standard_col, source_col in mapping.items():
-        if source_col and source_col in df.columns:
-            mapped_df[standard_col] = df[source_col]
+    # Select all mapped source columns at once, then relabel them; set_axis
+    # also copes with one source column feeding two standard columns
+    pairs = [
+        (standard_col, source_col)
+        for standard_col, source_col in mapping.items()
+        if source_col and source_col in df.columns
+    ]
+    mapped_df = df[[source_col for _, source_col in pairs]].set_axis(
+        [standard_col for standard_col, _ in pairs], axis=1
+    )
 
     # Ensure required columns exist with defaults
     if "ID" not in mapped_df.columns:
@@ -2,14 +2,6 @@
 
 import numpy as np
 
-# Try to import sklearn for advanced north calculation
-try:
-    from sklearn.decomposition import PCA
-
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-
 
 class SurveyProcessor:
     """Handles survey data processing and coordinate transformations"""
@@ -21,6 +13,7 @@ class SurveyProcessor:
         self.basepoint_n = basepoint_n
         self.basepoint_e = basepoint_e
         self.basepoint_z = basepoint_z
+        self._bp = np.array([basepoint_n, basepoint_e, basepoint_z], dtype=np.float64)
 
     def calculate_north_direction(self, df):
         """Calculate grid north from survey point distribution"""
@@ -28,54 +21,64 @@ class SurveyProcessor:
             return 0.0  # Need at least 3 points
 
         try:
-            if SKLEARN_AVAILABLE:
-                # Advanced method using PCA
-                coords = df[["N", "E"]].values
-
-                # Use PCA to find primary orientation
-                pca = PCA(n_components=2)
-                pca.fit(coords)
-
-                # First principal component gives primary site orientation
-                primary_direction = pca.components_[0]
-
-                # Calculate angle from east to north direction
-                north_angle = np.degrees(
-                    np.arctan2(primary_direction[0], primary_direction[1])
-                )
-
-                return north_angle
-            else:
-                # Simple fallback method
-                n_coords = df["N"].values
-                e_coords = df["E"].values
-
-                # Find most northerly and southerly points
-                max_n_idx = np.argmax(n_coords)
-                min_n_idx = np.argmin(n_coords)
-
-                # Calculate direction vector
-                dn = n_coords[max_n_idx] - n_coords[min_n_idx]
-                de = e_coords[max_n_idx] - e_coords[min_n_idx]
-
-                # Calculate angle
-                if abs(dn) > 0.001:
-                    north_angle = np.degrees(np.arctan2(de, dn))
-                    return north_angle
-                else:
-                    return 0.0
+            # Primary site orientation is the principal axis of the centred
+            # N/E cloud: the top eigenvector of its 2x2 scatter matrix
+            coords = df[["N", "E"]].to_numpy(dtype=np.float64)
+            coords = coords - coords.mean(axis=0)
+            _, vectors = np.linalg.eigh(coords.T @ coords)
+            primary_direction = vectors[:, -1]
+
+            # Fix the sign as scikit-learn 1.3 PCA does (svd_flip on U): the
+            # point projecting furthest onto the axis lies on its positive side
+            scores = coords @ primary_direction
+            if scores[np.argmax(np.abs(scores))] < 0:
+                primary_direction = -primary_direction
+
+            # Calculate angle from east to north direction
+            north_angle = np.degrees(
+                np.arctan2(primary_direction[0], primary_direction[1])
+            )
+
+            return float(north_angle)
 
         except Exception:
             return 0.0
 
     def transform_coordinates(self, df):
-        """Apply coordinate transformation based on system type and basepoint"""
-        transformed_df = df.copy()
-
-        if self.coord_system == "Local":
-            # For local coordinates, subtract basepoint
-            transformed_df["N"] = df["N"] - self.basepoint_n
-            transformed_df["E"] = df["E"] - self.basepoint_e
-            transformed_df["Z"] = df["Z"] - self.basepoint_z
-
-        return transformed_df
+        """Apply coordinate transformation based on system type and basepoint
+
+        The result may be the input frame itself; treat both as read-only.
+        """
+        if self.coord_system != "Local":
+            return df
+
+        # For local coordinates, subtract basepoint from the N/E/Z block at once;
+        # assign replaces those columns without deep-copying the others
+        coords = df[["N", "E", "Z"]].to_numpy(dtype=np.float64) - self._bp
+        return df.assign(N=coords[:, 0], E=coords[:, 1], Z=coords[:, 2])
+
+    def convert_and_transform(self, df, factor=1.0):
+        """Scale coordinates to meters and apply the transformation in one pass
+
+        Returns (df_meters, transformed_df). Either may be the input frame
+        itself; treat all three as read-only.
+        """
+        local = self.coord_system == "Local"
+        if factor == 1.0 and not local:
+            return df, df
+
+        # Pull the N/E/Z block once and derive both results from it
+        coords = df[["N", "E", "Z"]].to_numpy(dtype=np.float64)
+        if factor != 1.0:
+            coords = coords * factor
+            df_meters = df.assign(N=coords[:, 0], E=coords[:, 1], Z=coords[:, 2])
+        else:
+            df_meters = df
+
+        if not local:
+            return df_meters, df_meters
+
+        coords = coords - self._bp
+        return df_meters, df_meters.assign(
+            N=coords[:, 0], E=coords[:, 1], Z=coords[:, 2]
+        )
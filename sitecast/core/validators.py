@@ -1,5 +1,6 @@
 """Coordinate validation and quality checks"""
 
+import numpy as np
 import pandas as pd
 from ..config import CONVERSION_FACTORS
 
@@ -13,14 +14,11 @@ class CoordinateValidator:
         if not all(col in df.columns for col in ["N", "E", "Z"]):
             return "unknown"
 
-        # Calculate ranges
-        n_range = df["N"].max() - df["N"].min() if len(df) > 1 else abs(df["N"].iloc[0])
-        e_range = df["E"].max() - df["E"].min() if len(df) > 1 else abs(df["E"].iloc[0])
-        z_range = df["Z"].max() - df["Z"].min() if len(df) > 1 else abs(df["Z"].iloc[0])
-
-        # Check coordinate magnitudes
-        max_coord = max(df["N"].abs().max(), df["E"].abs().max())
-        max_elevation = df["Z"].abs().max()
+        # Largest magnitude per column in one reduction; fmax skips NaN
+        coords = df[["N", "E", "Z"]].to_numpy(dtype=np.float64)
+        abs_max = np.fmax.reduce(np.abs(coords), axis=0, initial=np.nan)
+        max_coord = max(abs_max[0], abs_max[1])
+        max_elevation = abs_max[2]
 
         # Conservative heuristics for unit detection
         if max_coord > 10000000:  # Very large numbers (>10M) suggest mm
@@ -36,20 +34,21 @@ class CoordinateValidator:
 
     @staticmethod
     def convert_units(df, from_unit, to_unit="m"):
-        """Convert coordinates between units"""
+        """Convert coordinates between units
+
+        The result may be the input frame itself; treat both as read-only.
+        """
         if from_unit == to_unit:
-            return df.copy()
+            return df
 
         factor = CONVERSION_FACTORS.get((from_unit, to_unit))
         if factor is None:
             raise ValueError(f"Conversion from {from_unit} to {to_unit} not supported")
 
-        converted_df = df.copy()
-        for col in ["N", "E", "Z"]:
-            if col in converted_df.columns:
-                converted_df[col] = converted_df[col] * factor
-
-        return converted_df
+        # Scale all coordinate columns in one multiply; assign avoids a deep copy
+        present = [col for col in ["N", "E", "Z"] if col in df.columns]
+        scaled = df[present].to_numpy(dtype=np.float64) * factor
+        return df.assign(**{col: scaled[:, i] for i, col in enumerate(present)})
 
     @staticmethod
     def validate_coordinates(df):
@@ -65,30 +64,39 @@ class CoordinateValidator:
             return errors, warnings
 
         # Check for numeric data
+        numeric = [
+            col for col in required_cols if pd.api.types.is_numeric_dtype(df[col])
+        ]
+        arr = df[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+        null_counts = dict(zip(numeric, np.isnan(arr).sum(axis=0).tolist()))
         for col in required_cols:
-            if not pd.api.types.is_numeric_dtype(df[col]):
+            if col not in null_counts:
                 errors.append(f"Column {col} must contain numeric values")
-            elif df[col].isnull().any():
-                null_count = df[col].isnull().sum()
-                errors.append(f"Column {col} has {null_count} missing values")
+            elif null_counts[col]:
+                errors.append(f"Column {col} has {null_counts[col]} missing values")
 
-        if errors:
+        if errors or len(arr) == 0:
             return errors, warnings
 
-        # Check coordinate ranges (warnings only)
-        n_range = df["N"].max() - df["N"].min()
-        e_range = df["E"].max() - df["E"].min()
+        # Check coordinate ranges (warnings only), reusing the array above
+        mins = arr.min(axis=0)
+        maxs = arr.max(axis=0)
+        n_range, e_range = (maxs - mins)[:2]
 
         if n_range > 100000 or e_range > 100000:
             warnings.append(
                 "Large coordinate range detected - verify coordinate system"
             )
 
-        if df["Z"].min() < -1000 or df["Z"].max() > 10000:
+        if mins[2] < -1000 or maxs[2] > 10000:
             warnings.append("Unusual elevation values detected")
 
         # Check for duplicate points
-        duplicates = df[["N", "E", "Z"]].duplicated().sum()
+        # Count repeated rows by hashing each (N, E, Z) triple as raw bytes;
+        # adding 0.0 folds -0.0 into 0.0 so equal values share a byte pattern
+        coords = np.ascontiguousarray(arr + 0.0)
+        rows = coords.view(np.dtype((np.void, coords.itemsize * 3))).ravel()
+        duplicates = len(rows) - len(np.unique(rows))
         if duplicates > 0:
             warnings.append(f"{duplicates} duplicate coordinate points found")
 
@@ -1,6 +1,12 @@
 """IFC file creation and structure"""
 
+import os
 import uuid
+import weakref
+from base64 import b64encode
+
+import numpy as np
+
 try:
     import ifcopenshell
     USE_IFCOPENSHELL = True
@@ -9,9 +15,60 @@ except ImportError:
     from .ifc_writer import IFCWriter, IFCBuilder
 
 
+# Standard base64 alphabet mapped onto the IFC GlobalId alphabet
+_IFC_GUID_CHARS = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$",
+)
+
+# GUIDs generated ahead of time by reserve_guids, consumed by create_guid
+_GUID_POOL = []
+
+# Entities reused within one IFC file, dropped together with the file
+_SHARED_ENTITIES = weakref.WeakKeyDictionary()
+
+
+def shared_entity(file, key, factory):
+    """Return the entity stored under ``key`` for this file, creating it once"""
+    entities = _SHARED_ENTITIES.setdefault(file, {})
+    entity = entities.get(key)
+    if entity is None:
+        entity = entities[key] = factory()
+    return entity
+
+
+def bulk_guids(count):
+    """Generate ``count`` IFC GlobalIds in one batch"""
+    if count <= 0:
+        return []
+
+    # Random version 4 UUIDs, each left-padded with two zero bytes as in
+    # ifcopenshell.guid.compress; 18-byte records encode to 24 base64 chars
+    # with no padding, so one b64encode call covers the whole batch
+    raw = np.zeros((count, 18), dtype=np.uint8)
+    raw[:, 2:] = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(
+        count, 16
+    )
+    raw[:, 8] = (raw[:, 8] & 0x0F) | 0x40
+    raw[:, 10] = (raw[:, 10] & 0x3F) | 0x80
+    encoded = b64encode(raw.tobytes()).decode().translate(_IFC_GUID_CHARS)
+    return [encoded[i + 2 : i + 24] for i in range(0, 24 * count, 24)]
+
+
+def reserve_guids(count):
+    """Pre-generate ``count`` GUIDs so create_guid can hand them out cheaply"""
+    if USE_IFCOPENSHELL:
+        _GUID_POOL.extend(bulk_guids(count))
+
+
 def create_guid():
     """Create a new GUID for IFC entities"""
     if USE_IFCOPENSHELL:
+        if _GUID_POOL:
+            try:
+                return _GUID_POOL.pop()
+            except IndexError:
+                pass  # drained by another session between check and pop
         return ifcopenshell.guid.compress(uuid.uuid4().hex)
     else:
         # Use our custom GUID generator
@@ -140,4 +197,4 @@ def create_ifc_file(
             def __init__(self, id):
                 self.id = id
                 
-        return mock_file, MockStorey(builder.storey_id), MockContext(builder.context_id)
\ No newline at end of file
+        return mock_file, MockStorey(builder.storey_id), MockContext(builder.context_id)
\ No newline at end of file
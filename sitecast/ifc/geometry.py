@@ -1,8 +1,18 @@
 """Geometry creation functions for IFC entities"""
 
+from .builder import shared_entity
+
 
 def create_cone_geometry(file, context, radius=0.2, height=0.5):
-    """Create a cone geometry"""
+    """Create a cone geometry, shared by all cones of the same size"""
+    return shared_entity(
+        file,
+        ("cone", radius, height),
+        lambda: _build_cone_geometry(file, radius, height),
+    )
+
+
+def _build_cone_geometry(file, radius, height):
     # Create base circle profile
     circle = file.create_entity(
         "IfcCircleProfileDef", ProfileType="AREA", Radius=radius
@@ -30,8 +40,11 @@ def create_cone_geometry(file, context, radius=0.2, height=0.5):
 
 def create_sphere_geometry(file, radius=0.1):
     """Create sphere geometry for coordination objects"""
-    sphere = file.create_entity("IfcSphere", Radius=radius)
-    return sphere
+    return shared_entity(
+        file,
+        ("sphere", radius),
+        lambda: file.create_entity("IfcSphere", Radius=radius),
+    )
 
 
 # Norwegian-style geometry additions
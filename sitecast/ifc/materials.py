@@ -1,39 +1,50 @@
 """Material creation functions for IFC entities"""
 
+from .builder import shared_entity
+
 
 def create_material(file, name, color_rgb):
-    """Create a colored material"""
-    color = file.create_entity(
+    """Create a colored material, reusing an identical one in the same file"""
+    return shared_entity(
+        file,
+        ("material", name, tuple(color_rgb)),
+        lambda: _build_material(file, name, color_rgb),
+    )
+
+
+def _build_material(file, name, color_rgb):
+    create = file.create_entity
+    color = create(
         "IfcColourRgb",
         Name=name,
         Red=color_rgb[0],
         Green=color_rgb[1],
         Blue=color_rgb[2],
     )
-    surface_style_rendering = file.create_entity(
+    surface_style_rendering = create(
         "IfcSurfaceStyleRendering",
         SurfaceColour=color,
         Transparency=0.0,
         ReflectanceMethod="FLAT",
     )
-    surface_style = file.create_entity(
+    surface_style = create(
         "IfcSurfaceStyle",
         Name=f"{name} Material",
         Side="BOTH",
         Styles=[surface_style_rendering],
     )
-    material = file.create_entity("IfcMaterial", Name=f"{name} Material")
+    material = create("IfcMaterial", Name=f"{name} Material")
 
     # Get the first representation context
     context = file.by_type("IfcRepresentationContext")[0]
-    styled_representation = file.create_entity(
+    styled_representation = create(
         "IfcStyledRepresentation",
         ContextOfItems=context,
         RepresentationIdentifier="Material",
         RepresentationType="Material",
-        Items=[file.create_entity("IfcStyledItem", Item=None, Styles=[surface_style])],
+        Items=[create("IfcStyledItem", Item=None, Styles=[surface_style])],
     )
-    file.create_entity(
+    create(
         "IfcMaterialDefinitionRepresentation",
         Representations=[styled_representation],
         RepresentedMaterial=material,
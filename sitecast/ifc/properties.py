@@ -2,6 +2,21 @@
 
 from .builder import create_guid
 
+LOCAL_COORDINATES_FORMAT = "[N:%.3f, E:%.3f, Z:%.3f]"
+
+
+def _shared_text_property(file, shared, name, value):
+    """Return a text property, reusing one already created with the same value"""
+    key = (name, value)
+    prop = shared.get(key)
+    if prop is None:
+        prop = shared[key] = file.create_entity(
+            "IfcPropertySingleValue",
+            Name=name,
+            NominalValue=file.create_entity("IfcText", value),
+        )
+    return prop
+
 
 def create_enhanced_property_set(
     file,
@@ -15,103 +30,95 @@ def create_enhanced_property_set(
     source_filename,
     creator_name,
     external_link,
+    shared=None,
+    local_text=None,
 ):
-    """Create enhanced property set with coordinates and custom properties"""
+    """Create enhanced property set with coordinates and custom properties
+
+    Pass the same ``shared`` dict for every point in a file to reuse the METRE
+    unit and the properties whose values are identical across points.
+    ``local_text`` is the preformatted Local_Coordinates value, if known.
+    """
+    if shared is None:
+        shared = {}
+    create = file.create_entity
     properties = []
 
     # Source information
-    prop_source = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Source",
-        NominalValue=file.create_entity("IfcText", source_filename),
-    )
-    properties.append(prop_source)
-
-    prop_creator = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Created_By",
-        NominalValue=file.create_entity("IfcText", creator_name),
-    )
-    properties.append(prop_creator)
+    properties.append(_shared_text_property(file, shared, "Source", source_filename))
+    properties.append(_shared_text_property(file, shared, "Created_By", creator_name))
 
     # Point ID
-    prop_point_id = file.create_entity(
+    prop_point_id = create(
         "IfcPropertySingleValue",
         Name="Point_ID",
-        NominalValue=file.create_entity(
-            "IfcText", str(point_data.get("ID", "Unknown"))
-        ),
+        NominalValue=create("IfcText", str(point_data.get("ID", "Unknown"))),
     )
     properties.append(prop_point_id)
 
-    # Original coordinates
-    prop_northing = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Northing_Y",
-        NominalValue=file.create_entity("IfcReal", float(original_coords["N"])),
-        Unit=file.create_entity("IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE"),
-    )
-    properties.append(prop_northing)
+    metre = shared.get("METRE")
+    if metre is None:
+        metre = shared["METRE"] = create(
+            "IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE"
+        )
 
-    prop_easting = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Easting_X",
-        NominalValue=file.create_entity("IfcReal", float(original_coords["E"])),
-        Unit=file.create_entity("IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE"),
-    )
-    properties.append(prop_easting)
+    def length_property(name, value):
+        return create(
+            "IfcPropertySingleValue",
+            Name=name,
+            NominalValue=create("IfcReal", float(value)),
+            Unit=metre,
+        )
 
-    prop_altitude = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Altitude_Z",
-        NominalValue=file.create_entity("IfcReal", float(original_coords["Z"])),
-        Unit=file.create_entity("IfcSIUnit", UnitType="LENGTHUNIT", Name="METRE"),
-    )
-    properties.append(prop_altitude)
+    # Original coordinates
+    properties.append(length_property("Northing_Y", original_coords["N"]))
+    properties.append(length_property("Easting_X", original_coords["E"]))
+    properties.append(length_property("Altitude_Z", original_coords["Z"]))
 
     # Offsets
-    prop_offsets = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Offsets",
-        NominalValue=file.create_entity(
-            "IfcText",
+    properties.append(
+        _shared_text_property(
+            file,
+            shared,
+            "Offsets",
             f"[N:{offsets['N']:.3f}, E:{offsets['E']:.3f}, Z:{offsets['Z']:.3f}]",
-        ),
+        )
     )
-    properties.append(prop_offsets)
 
     # Local coordinates
-    prop_local_coords = file.create_entity(
+    if local_text is None:
+        local_text = LOCAL_COORDINATES_FORMAT % (
+            local_coords["N"],
+            local_coords["E"],
+            local_coords["Z"],
+        )
+    prop_local_coords = create(
         "IfcPropertySingleValue",
         Name="Local_Coordinates",
-        NominalValue=file.create_entity(
-            "IfcText",
-            f"[N:{local_coords['N']:.3f}, E:{local_coords['E']:.3f}, Z:{local_coords['Z']:.3f}]",
-        ),
+        NominalValue=create("IfcText", local_text),
     )
     properties.append(prop_local_coords)
 
     # Add custom properties
     for custom_prop in custom_properties:
         if custom_prop["name"] and custom_prop["value"]:
-            prop_custom = file.create_entity(
-                "IfcPropertySingleValue",
-                Name=custom_prop["name"].replace(" ", "_"),
-                NominalValue=file.create_entity("IfcText", str(custom_prop["value"])),
+            properties.append(
+                _shared_text_property(
+                    file,
+                    shared,
+                    custom_prop["name"].replace(" ", "_"),
+                    str(custom_prop["value"]),
+                )
             )
-            properties.append(prop_custom)
 
     # External link if provided
     if external_link:
-        prop_link = file.create_entity(
-            "IfcPropertySingleValue",
-            Name="External_Link",
-            NominalValue=file.create_entity("IfcText", external_link),
+        properties.append(
+            _shared_text_property(file, shared, "External_Link", external_link)
         )
-        properties.append(prop_link)
 
     # Create the property set
-    property_set = file.create_entity(
+    property_set = create(
         "IfcPropertySet",
         GlobalId=create_guid(),
         Name=pset_name,
@@ -119,7 +126,7 @@ def create_enhanced_property_set(
     )
 
     # Attach to survey point
-    file.create_entity(
+    create(
         "IfcRelDefinesByProperties",
         GlobalId=create_guid(),
         RelatedObjects=[survey_point],
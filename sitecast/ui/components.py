@@ -1,18 +1,50 @@
 """Reusable UI components"""
 
+import numpy as np
 import streamlit as st
-from ..ifc.builder import create_guid
+from ..ifc.builder import bulk_guids, create_guid, reserve_guids, shared_entity
 from ..ifc.geometry import create_cone_geometry, create_sphere_geometry
-from ..ifc.properties import create_enhanced_property_set
+from ..ifc.properties import (
+    LOCAL_COORDINATES_FORMAT,
+    create_enhanced_property_set,
+)
 
 
 # Note: The updated create_enhanced_survey_point function is defined below (line 358+)
 
+# Coordinates property text of coordination objects
+COORDINATES_FORMAT = "N:%.3f, E:%.3f, Z:%.3f"
+
+
+def contain_in_storey(file, storey, elements):
+    """Place all ``elements`` in the storey through one containment relation"""
+    if elements:
+        file.create_entity(
+            "IfcRelContainedInSpatialStructure",
+            GlobalId=create_guid(),
+            RelatingStructure=storey,
+            RelatedElements=list(elements),
+        )
+
 
 def create_coordination_object(
-    file, storey, context, name, n, e, z, material, description="Coordination Point"
+    file,
+    storey,
+    context,
+    name,
+    n,
+    e,
+    z,
+    material,
+    description="Coordination Point",
+    contained=None,
 ):
-    """Create a coordination object (small sphere) at specified coordinates"""
+    """Create a coordination object (small sphere) at specified coordinates
+
+    If ``contained`` is a list the object is appended to it, for the caller
+    to place in the storey with contain_in_storey, instead of getting its
+    own containment relation.
+    """
     # Create sphere geometry
     sphere = create_sphere_geometry(file, radius=0.1)
 
@@ -50,26 +82,28 @@ def create_coordination_object(
     )
 
     # Create containment relationship
-    file.create_entity(
-        "IfcRelContainedInSpatialStructure",
-        GlobalId=create_guid(),
-        RelatingStructure=storey,
-        RelatedElements=[coord_object],
-    )
+    if contained is None:
+        contain_in_storey(file, storey, [coord_object])
+    else:
+        contained.append(coord_object)
 
-    # Create custom properties
+    # Create custom properties; the object type is the same for every one
     properties = []
-    prop_type = file.create_entity(
-        "IfcPropertySingleValue",
-        Name="Object Type",
-        NominalValue=file.create_entity("IfcText", "Coordination Object"),
+    prop_type = shared_entity(
+        file,
+        ("property", "Object Type", "Coordination Object"),
+        lambda: file.create_entity(
+            "IfcPropertySingleValue",
+            Name="Object Type",
+            NominalValue=file.create_entity("IfcText", "Coordination Object"),
+        ),
     )
     properties.append(prop_type)
 
     prop_coords = file.create_entity(
         "IfcPropertySingleValue",
         Name="Coordinates",
-        NominalValue=file.create_entity("IfcText", f"N:{n:.3f}, E:{e:.3f}, Z:{z:.3f}"),
+        NominalValue=file.create_entity("IfcText", COORDINATES_FORMAT % (n, e, z)),
     )
     properties.append(prop_coords)
 
@@ -102,8 +136,13 @@ def create_norwegian_basepoint(
     start_angle_degrees=270,
     add_cylinder=False,
     add_north_arrow=False,
+    contained=None,
 ):
-    """Create a Norwegian-style basepoint with pie slice marker"""
+    """Create a Norwegian-style basepoint with pie slice marker
+
+    ``contained`` collects the created elements as in
+    create_coordination_object.
+    """
     from ..ifc.geometry import (
         create_pie_slice_geometry,
         create_hollow_cylinder_geometry,
@@ -162,15 +201,8 @@ def create_norwegian_basepoint(
         RelatingMaterial=materials["magenta"],
     )
 
-    # Add to storey
-    file.create_entity(
-        "IfcRelContainedInSpatialStructure",
-        GlobalId=create_guid(),
-        RelatingStructure=storey,
-        RelatedElements=[pie_slice],
-    )
-
     elements = [pie_slice]
+    teal_elements = []
 
     # Optionally add hollow cylinder
     if add_cylinder:
@@ -200,21 +232,7 @@ def create_norwegian_basepoint(
             Representation=cylinder_product,
         )
 
-        file.create_entity(
-            "IfcRelAssociatesMaterial",
-            GlobalId=create_guid(),
-            RelatedObjects=[cylinder],
-            RelatingMaterial=materials["teal"],
-        )
-
-        file.create_entity(
-            "IfcRelContainedInSpatialStructure",
-            GlobalId=create_guid(),
-            RelatingStructure=storey,
-            RelatedElements=[cylinder],
-        )
-
-        elements.append(cylinder)
+        teal_elements.append(cylinder)
 
     # Optionally add north arrow
     if add_north_arrow:
@@ -253,46 +271,31 @@ def create_norwegian_basepoint(
             Representation=arrow_product,
         )
 
+        teal_elements.append(arrow)
+
+    # Cylinder and north arrow share the teal material relation
+    if teal_elements:
         file.create_entity(
             "IfcRelAssociatesMaterial",
             GlobalId=create_guid(),
-            RelatedObjects=[arrow],
+            RelatedObjects=teal_elements,
             RelatingMaterial=materials["teal"],
         )
+        elements.extend(teal_elements)
 
-        file.create_entity(
-            "IfcRelContainedInSpatialStructure",
-            GlobalId=create_guid(),
-            RelatingStructure=storey,
-            RelatedElements=[arrow],
-        )
-
-        elements.append(arrow)
+    # Add to storey
+    if contained is None:
+        contain_in_storey(file, storey, elements)
+    else:
+        contained.extend(elements)
 
     return elements
 
 
-# Enhanced survey point function with all shape support
-def create_enhanced_survey_point(
-    file,
-    storey,
-    context,
-    point_data,
-    material,
-    original_coords,
-    local_coords,
-    offsets,
-    pset_name,
-    custom_properties,
-    source_filename,
-    creator_name="SiteCast",
-    external_link="",
-    marker_shape="Cone",
-    marker_height=0.5,
-    marker_diameter=0.2,
-    use_inverted=True,
+def _create_marker_shape(
+    file, context, marker_shape, marker_height, marker_diameter, use_inverted
 ):
-    """Create a survey point element with enhanced property sets and configurable marker"""
+    """Create the product shape for a survey point marker"""
     from ..ifc.geometry_enhanced import (
         create_inverted_cone_geometry,
         create_pyramid_geometry,
@@ -300,12 +303,6 @@ def create_enhanced_survey_point(
         create_sphere_marker_geometry,
     )
 
-    point_id = point_data.get("ID", "Unknown")
-    n = float(point_data.get("N", 0))
-    e = float(point_data.get("E", 0))
-    z = float(point_data.get("Z", 0))
-    description = point_data.get("Description", "")
-
     # Create geometry based on marker type
     if marker_shape == "Cone":
         if use_inverted:
@@ -378,6 +375,41 @@ def create_enhanced_survey_point(
         "IfcProductDefinitionShape", Representations=[shape_representation]
     )
 
+    return product_shape
+
+
+# Enhanced survey point function with all shape support
+def create_enhanced_survey_point(
+    file,
+    storey,
+    context,
+    point_data,
+    material,
+    original_coords,
+    local_coords,
+    offsets,
+    pset_name,
+    custom_properties,
+    source_filename,
+    creator_name="SiteCast",
+    external_link="",
+    marker_shape="Cone",
+    marker_height=0.5,
+    marker_diameter=0.2,
+    use_inverted=True,
+    shared_properties=None,
+):
+    """Create a survey point element with enhanced property sets and configurable marker"""
+    point_id = point_data.get("ID", "Unknown")
+    n = float(point_data.get("N", 0))
+    e = float(point_data.get("E", 0))
+    z = float(point_data.get("Z", 0))
+    description = point_data.get("Description", "")
+
+    product_shape = _create_marker_shape(
+        file, context, marker_shape, marker_height, marker_diameter, use_inverted
+    )
+
     # Create local placement
     local_placement = file.create_entity(
         "IfcLocalPlacement",
@@ -429,6 +461,121 @@ def create_enhanced_survey_point(
         source_filename,
         creator_name,
         external_link,
+        shared=shared_properties,
     )
 
     return survey_point
+
+
+def create_enhanced_survey_points_batch(
+    file,
+    storey,
+    context,
+    df,
+    original_df,
+    material,
+    offsets,
+    pset_name,
+    custom_properties,
+    source_filename,
+    creator_name="SiteCast",
+    external_link="",
+    marker_shape="Cone",
+    marker_height=0.5,
+    marker_diameter=0.2,
+    use_inverted=True,
+    progress_callback=None,
+):
+    """Create survey points for every row of ``df`` in one pass
+
+    All markers share one product shape, and the points are related to the
+    material and the storey through a single relationship each. Original
+    coordinates are read from ``original_df`` rows with the same index.
+    """
+    create = file.create_entity
+    product_shape = _create_marker_shape(
+        file, context, marker_shape, marker_height, marker_diameter, use_inverted
+    )
+
+    local = df[["N", "E", "Z"]].to_numpy(dtype=np.float64)
+    original = original_df.loc[df.index, ["N", "E", "Z"]].to_numpy(dtype=np.float64)
+
+    # IFC placements are X/Y/Z, i.e. E/N/Z; swap the columns once for all points
+    xyz = local[:, [1, 0, 2]].tolist()
+    local_texts = [LOCAL_COORDINATES_FORMAT % row for row in map(tuple, local.tolist())]
+    point_ids = df["ID"].tolist() if "ID" in df.columns else ["Unknown"] * len(df)
+    descriptions = (
+        df["Description"].tolist() if "Description" in df.columns else [""] * len(df)
+    )
+
+    # Annotation names and descriptions for all points in one go
+    names = [f"{point_id}" for point_id in point_ids]
+    labels = [
+        f'Fastmerke "{name}" - {description}' if description else f'Fastmerke "{name}"'
+        for name, description in zip(names, descriptions)
+    ]
+
+    # Annotation GlobalIds up front; property sets draw on the reserved pool
+    guids = bulk_guids(len(df))
+    reserve_guids(2 * len(df) + 2)
+
+    shared_properties = {}
+    survey_points = []
+    # Report progress about 50 times, not once per point
+    progress_step = max(1, len(df) // 50)
+    for i, (point_id, coords, (orig_n, orig_e, orig_z)) in enumerate(
+        zip(point_ids, xyz, original.tolist())
+    ):
+        if progress_callback is not None and i % progress_step == 0:
+            progress_callback(i)
+
+        # Create local placement
+        local_placement = create(
+            "IfcLocalPlacement",
+            RelativePlacement=create(
+                "IfcAxis2Placement3D",
+                Location=create("IfcCartesianPoint", Coordinates=coords),
+            ),
+        )
+
+        # Create annotation element
+        survey_point = create(
+            "IfcAnnotation",
+            GlobalId=guids[i],
+            Name=names[i],
+            Description=labels[i],
+            ObjectType="Fastmerke",
+            ObjectPlacement=local_placement,
+            Representation=product_shape,
+        )
+        survey_points.append(survey_point)
+
+        create_enhanced_property_set(
+            file,
+            survey_point,
+            {"ID": point_id},
+            pset_name,
+            custom_properties,
+            {"N": orig_n, "E": orig_e, "Z": orig_z},
+            None,
+            offsets,
+            source_filename,
+            creator_name,
+            external_link,
+            shared=shared_properties,
+            local_text=local_texts[i],
+        )
+
+    if survey_points:
+        # Assign material to all survey points
+        create(
+            "IfcRelAssociatesMaterial",
+            GlobalId=create_guid(),
+            RelatedObjects=survey_points,
+            RelatingMaterial=material,
+        )
+
+        # Create containment relationship
+        contain_in_storey(file, storey, survey_points)
+
+    return survey_points
@@ -1,9 +1,10 @@
 """Enhanced export section UI for IFC generation"""
 
+import hashlib
+import traceback
+
+import pandas as pd
 import streamlit as st
-import tempfile
-import os
-import time
 import ifcopenshell
 
 from ..ifc.builder import create_ifc_file
@@ -16,16 +17,33 @@ from ..ifc.materials import (
 )
 from ..config import MARKER_COLORS
 from .components import (
-    create_enhanced_survey_point,
+    create_enhanced_survey_points_batch,
+    contain_in_storey,
     create_coordination_object,
     create_norwegian_basepoint,
 )
+from ..utils.session import fragment
 from ..utils.verification import verify_ifc_coordinates
 from ..ifc.info_cube import create_information_cube
 
 
+# Mismatch table columns: original vs recalculated world coordinates
+VERIFICATION_COLUMNS = ["point_id"] + [
+    f"{prefix}_{axis}"
+    for axis in "NEZ"
+    for prefix in ("original", "calculated", "match")
+]
+
+
+@fragment
 def create_export_section(df, uploaded_file, config, warnings):
-    """Create export section for IFC file generation"""
+    """Create export section for IFC file generation
+
+    On Streamlit 1.37+ (st.fragment) this runs as a fragment: its widgets
+    rerun only this section, reusing the parsed and transformed data from the
+    last full run. Older releases, including the 1.28 pin in requirements.txt,
+    have no st.fragment and rerun the whole script as before.
+    """
     st.header("🚀 Generate IFC File")
 
     # Generate IFC button
@@ -34,13 +52,35 @@ def create_export_section(df, uploaded_file, config, warnings):
             generate_ifc_file(df, uploaded_file, config)
         except Exception as e:
             st.error(f"Error generating IFC file: {str(e)}")
-            import traceback
-
             st.code(traceback.format_exc())
 
 
+def _ifc_inputs_key(df, df_meters, uploaded_file, config):
+    """Digest of everything the generated IFC depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in (df, df_meters):
+        digest.update(pd.util.hash_pandas_object(frame).to_numpy().tobytes())
+        digest.update(repr(tuple(frame.columns)).encode())
+    file_name = uploaded_file.name if uploaded_file else "Unknown"
+    digest.update(repr((file_name, sorted(config.items()))).encode())
+    return digest.hexdigest()
+
+
 def generate_ifc_file(df, uploaded_file, config):
-    """Generate IFC file from survey data"""
+    """Generate IFC file from survey data
+
+    Re-clicking with unchanged data and settings reuses the previous result.
+    """
+    df_meters = st.session_state.get("df_meters", df)
+    if df_meters is None:
+        df_meters = df
+
+    inputs_key = _ifc_inputs_key(df, df_meters, uploaded_file, config)
+    cached = st.session_state.get("ifc_result")
+    if cached is not None and cached[0] == inputs_key:
+        _show_ifc_result(df, config, *cached[1:])
+        return
+
     # Create progress bar
     progress_bar = st.progress(0)
     status_text = st.empty()
@@ -88,6 +128,8 @@ def generate_ifc_file(df, uploaded_file, config):
     progress_bar.progress(30)
 
     coordination_objects_created = 0
+    # Collected for a single containment relation in the storey
+    coordination_elements = []
 
     if config["use_basepoint"]:
         if config.get("use_norwegian_basepoints", True):
@@ -105,6 +147,7 @@ def generate_ifc_file(df, uploaded_file, config):
                 start_angle_degrees=config.get("basepoint_orientation", 300),
                 add_cylinder=config.get("add_cylinder", True),
                 add_north_arrow=config.get("add_north_arrow", True),
+                contained=coordination_elements,
             )
             coordination_objects_created += 1
 
@@ -135,21 +178,19 @@ def generate_ifc_file(df, uploaded_file, config):
                 0.0,
                 materials["coord"],
                 f"Project basepoint: N={config['basepoint_n']:.3f}, E={config['basepoint_e']:.3f}, Z={config['basepoint_z']:.3f}",
+                contained=coordination_elements,
             )
             coordination_objects_created += 1
 
     if config["use_rotation_point"]:
-        if config.get("use_norwegian_basepoints", True):
-            # Calculate rotation point in local coordinates
-            if config["use_basepoint"]:
-                local_rot_n = config["rotation_n"] - config["basepoint_n"]
-                local_rot_e = config["rotation_e"] - config["basepoint_e"]
-                local_rot_z = config["rotation_z"] - config["basepoint_z"]
-            else:
-                local_rot_n = config["rotation_n"]
-                local_rot_e = config["rotation_e"]
-                local_rot_z = config["rotation_z"]
+        # Rotation point in local coordinates, for either marker style
+        local_rot_n, local_rot_e, local_rot_z = (
+            config[f"rotation_{axis}"]
+            - (config[f"basepoint_{axis}"] if config["use_basepoint"] else 0.0)
+            for axis in "nez"
+        )
 
+        if config.get("use_norwegian_basepoints", True):
             create_norwegian_basepoint(
                 file,
                 storey,
@@ -163,19 +204,10 @@ def generate_ifc_file(df, uploaded_file, config):
                 start_angle_degrees=config.get("rotation_orientation", 270),
                 add_cylinder=False,
                 add_north_arrow=False,
+                contained=coordination_elements,
             )
             coordination_objects_created += 1
         else:
-            # Calculate rotation point in local coordinates
-            if config["use_basepoint"]:
-                local_rot_n = config["rotation_n"] - config["basepoint_n"]
-                local_rot_e = config["rotation_e"] - config["basepoint_e"]
-                local_rot_z = config["rotation_z"] - config["basepoint_z"]
-            else:
-                local_rot_n = config["rotation_n"]
-                local_rot_e = config["rotation_e"]
-                local_rot_z = config["rotation_z"]
-
             create_coordination_object(
                 file,
                 storey,
@@ -186,104 +218,94 @@ def generate_ifc_file(df, uploaded_file, config):
                 local_rot_z,
                 materials["coord"],
                 f"Rotation point: N={config['rotation_n']:.3f}, E={config['rotation_e']:.3f}, Z={config['rotation_z']:.3f}",
+                contained=coordination_elements,
             )
             coordination_objects_created += 1
 
+    contain_in_storey(file, storey, coordination_elements)
+
     # Step 4: Create survey points
     status_text.text("Creating survey points...")
     progress_bar.progress(40)
 
     total_points = len(df)
-    df_meters = st.session_state.get("df_meters", df)
 
-    for idx, row in df.iterrows():
-        # Update progress
-        point_progress = 40 + int((idx / total_points) * 30)
+    offsets = {
+        "N": config["basepoint_n"],
+        "E": config["basepoint_e"],
+        "Z": config["basepoint_z"],
+    }
+
+    def update_progress(i):
+        point_progress = 40 + int((i / total_points) * 30)
         progress_bar.progress(point_progress)
-        status_text.text(f"Creating survey point {idx + 1} of {total_points}...")
-
-        point_data = row.to_dict()
-
-        # Prepare coordinate data
-        original_coords = {
-            "N": df_meters.loc[idx, "N"],
-            "E": df_meters.loc[idx, "E"],
-            "Z": df_meters.loc[idx, "Z"],
-        }
-
-        local_coords = {"N": row["N"], "E": row["E"], "Z": row["Z"]}
-
-        offsets = {
-            "N": config["basepoint_n"],
-            "E": config["basepoint_e"],
-            "Z": config["basepoint_z"],
-        }
-
-        # Create survey point with selected marker type
-        create_enhanced_survey_point(
-            file,
-            storey,
-            context,
-            point_data,
-            marker_material,
-            original_coords,
-            local_coords,
-            offsets,
-            config["pset_name"],
-            config["custom_properties"],
-            uploaded_file.name if uploaded_file else "Unknown",
-            config["creator_name"],
-            config["external_link"],
-            marker_shape=config.get("marker_shape", "Cone"),
-            marker_height=config.get("marker_height", 0.5),
-            marker_diameter=config.get("marker_diameter", 0.2),
-            use_inverted=config.get("use_inverted", True),
-        )
+        status_text.text(f"Creating survey point {i + 1} of {total_points}...")
+
+    # Create survey points with selected marker type
+    create_enhanced_survey_points_batch(
+        file,
+        storey,
+        context,
+        df,
+        df_meters,
+        marker_material,
+        offsets,
+        config["pset_name"],
+        config["custom_properties"],
+        uploaded_file.name if uploaded_file else "Unknown",
+        config["creator_name"],
+        config["external_link"],
+        marker_shape=config.get("marker_shape", "Cone"),
+        marker_height=config.get("marker_height", 0.5),
+        marker_diameter=config.get("marker_diameter", 0.2),
+        use_inverted=config.get("use_inverted", True),
+        progress_callback=update_progress,
+    )
 
     # Step 5: Save IFC file
     status_text.text("Saving IFC file...")
     progress_bar.progress(70)
 
-    # Save to temporary file
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".ifc") as tmp_file:
-            tmp_file_path = tmp_file.name
-
-        # Write IFC file
-        file.write(tmp_file_path)
-
-        # Step 6: Read file for download
-        status_text.text("Preparing download...")
-        progress_bar.progress(80)
-
-        with open(tmp_file_path, "rb") as f:
-            ifc_data = f.read()
+    # Serialise once in memory for the download
+    ifc_data = file.to_string().encode("utf-8")
 
-        # Step 7: Coordinate verification
-        verification_results = None
-        if config["verify_coordinates"]:
-            status_text.text("Verifying coordinates...")
-            progress_bar.progress(90)
+    # Step 6: Prepare download
+    status_text.text("Preparing download...")
+    progress_bar.progress(80)
 
-            verification_results = verify_ifc_coordinates(
-                tmp_file_path, df_meters, offsets
-            )
+    # Step 7: Coordinate verification
+    verification_results = None
+    if config["verify_coordinates"]:
+        status_text.text("Verifying coordinates...")
+        progress_bar.progress(90)
 
-    finally:
-        # Clean up
-        for attempt in range(3):
-            try:
-                if os.path.exists(tmp_file_path):
-                    os.unlink(tmp_file_path)
-                break
-            except PermissionError:
-                if attempt < 2:
-                    time.sleep(0.1)
+        # Check the model we just built instead of re-parsing its STEP text
+        verification_results = verify_ifc_coordinates(file, df_meters, offsets)
 
     # Step 8: Complete
     status_text.text("IFC generation complete!")
     progress_bar.progress(100)
 
+    # Keep only the latest result; it is replaced on the next change
+    st.session_state.ifc_result = (
+        inputs_key,
+        ifc_data,
+        coordination_objects_created,
+        verification_results,
+    )
+    _show_ifc_result(
+        df, config, ifc_data, coordination_objects_created, verification_results
+    )
+
+    # Clear progress indicators
+    progress_bar.empty()
+    status_text.empty()
+
+
+def _show_ifc_result(
+    df, config, ifc_data, coordination_objects_created, verification_results
+):
+    """Show the download button, summary and verification for a generated IFC"""
     st.success("✅ IFC file generated successfully!")
 
     # Download button
@@ -313,24 +335,23 @@ def generate_ifc_file(df, uploaded_file, config):
     )
 
     # Display verification results
-    if config["verify_coordinates"] and verification_results:
+    if config["verify_coordinates"] and verification_results is not None:
         display_verification_results(verification_results)
 
-    # Clear progress indicators
-    progress_bar.empty()
-    status_text.empty()
-
 
 def display_verification_results(verification_results):
     """Display coordinate verification results"""
     if isinstance(verification_results, str):
         st.warning(f"⚠️ **Coordinate Verification Failed**: {verification_results}")
-    elif isinstance(verification_results, list) and len(verification_results) > 0:
+    elif isinstance(verification_results, pd.DataFrame) and len(
+        verification_results
+    ):
         st.success("✅ **Coordinate Verification Complete**")
 
         # Count matches
         total_points = len(verification_results)
-        all_matches = sum(1 for result in verification_results if result["all_match"])
+        all_match = verification_results["all_match"].to_numpy()
+        all_matches = int(all_match.sum())
 
         if all_matches == total_points:
             st.success(
@@ -341,29 +362,15 @@ def display_verification_results(verification_results):
                 f"⚠️ **Partial Match**: {all_matches}/{total_points} points verified successfully"
             )
 
-        # Show detailed results
+        # Show detailed results: one table of the mismatched points
         with st.expander("🔍 View Detailed Verification Results"):
-            for result in verification_results:
-                point_id = result["point_id"]
-                if result["all_match"]:
-                    st.success(f"✅ **Point {point_id}**: Coordinates match perfectly")
-                else:
-                    st.error(f"❌ **Point {point_id}**: Coordinate mismatch detected")
-
-                    # Show coordinate comparison
-                    orig = result["original"]
-                    calc = result["calculated"]
-                    matches = result["matches"]
-
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        status = "✅" if matches["N"] else "❌"
-                        st.write(f"{status} **N**: {orig['N']:.3f} → {calc['N']:.3f}")
-                    with col2:
-                        status = "✅" if matches["E"] else "❌"
-                        st.write(f"{status} **E**: {orig['E']:.3f} → {calc['E']:.3f}")
-                    with col3:
-                        status = "✅" if matches["Z"] else "❌"
-                        st.write(f"{status} **Z**: {orig['Z']:.3f} → {calc['Z']:.3f}")
+            if all_matches == total_points:
+                st.success("✅ All points match within 1 mm")
+            else:
+                st.dataframe(
+                    verification_results.loc[~all_match, VERIFICATION_COLUMNS],
+                    hide_index=True,
+                    use_container_width=True,
+                )
     else:
         st.info("ℹ️ **Coordinate Verification**: No results to display")
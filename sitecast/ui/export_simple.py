@@ -51,11 +51,17 @@ def create_export_section(uploaded_file, df, df_meters, config):
             
             # Step 3: Add survey points
             total_points = len(df_processed)
-            for idx, row in df_processed.iterrows():
+            # Redraw the progress bar about 50 times, not once per point
+            progress_step = max(1, total_points // 50)
+            # Plain dicts per row instead of boxing each row into a Series
+            for idx, row in zip(
+                df_processed.index, df_processed.to_dict("records")
+            ):
                 # Update progress
-                point_progress = 30 + int((idx / total_points) * 50)
-                progress_bar.progress(point_progress)
-                status_text.text(f"Creating survey point {idx + 1} of {total_points}...")
+                if idx % progress_step == 0:
+                    point_progress = 30 + int((idx / total_points) * 50)
+                    progress_bar.progress(point_progress)
+                    status_text.text(f"Creating survey point {idx + 1} of {total_points}...")
                 
                 # Get point data
                 point_id = str(row.get("ID", f"PT{idx+1}"))
@@ -162,4 +168,4 @@ def display_verification_results(verification_results):
         if all_matches == total_points:
             st.success(f"🎯 **Perfect Match**: All {total_points} points verified successfully!")
         else:
-            st.warning(f"⚠️ **Partial Match**: {all_matches}/{total_points} points verified successfully")
\ No newline at end of file
+            st.warning(f"⚠️ **Partial Match**: {all_matches}/{total_points} points verified successfully")
\ No newline at end of file
@@ -1,17 +1,109 @@
 """Column mapping interface UI"""
 
+import io
+from itertools import islice
+import numpy as np
 import streamlit as st
 import pandas as pd
 from ..core.parsers import (
-    smart_parse_kof_file,
-    create_editable_coordinate_table,
+    smart_parse_kof_stream,
+    parse_kof_table,
     detect_coordinate_columns,
     apply_column_mapping,
 )
+from ..config import CONVERSION_FACTORS
 from ..core.validators import CoordinateValidator
-from ..core.processors import SurveyProcessor, SKLEARN_AVAILABLE
+from ..core.processors import SurveyProcessor
 from ..utils.templates import process_excel_file
 
+# Cap raw file previews so large uploads don't blow up the websocket message
+PREVIEW_LINES = 500
+
+# Column setup for the KOF coordinate editor; data_editor copies it per call
+KOF_EDITOR_COLUMNS = {
+    "ID": st.column_config.TextColumn("Point ID", required=True),
+    "N": st.column_config.NumberColumn("N (Northing)", format="%.3f"),
+    "E": st.column_config.NumberColumn("E (Easting)", format="%.3f"),
+    "Z": st.column_config.NumberColumn("Z (Elevation)", format="%.3f"),
+    "Description": st.column_config.TextColumn("Description"),
+}
+
+# Coordinate sample table, shown in meters with three decimals
+SAMPLE_COLUMNS = {
+    axis: st.column_config.NumberColumn(axis, format="%.3f m") for axis in "NEZ"
+}
+
+# Column mapping dropdowns for CSV/Excel: (mapping field, label, widget key)
+MAPPING_FIELDS = (
+    ("ID", "Point ID Column", "id_col"),
+    ("N", "N Coordinate (Northing)", "n_col"),
+    ("E", "E Coordinate (Easting)", "e_col"),
+    ("Z", "Z Coordinate (Elevation)", "z_col"),
+    ("Description", "Description (Optional)", "desc_col"),
+)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _read_tabular_file(file_bytes, file_extension):
+    """Parse CSV/Excel/KOF bytes into a DataFrame, cached on the file content"""
+    if file_extension == "csv":
+        df = _read_csv(file_bytes)
+    elif file_extension == "kof":
+        df = parse_kof_table(_kof_lines(io.BytesIO(file_bytes)))
+    else:
+        # openpyxl reads .xlsx only; let pandas pick the engine for .xls
+        df = process_excel_file(
+            io.BytesIO(file_bytes),
+            engine="openpyxl" if file_extension == "xlsx" else None,
+        )
+    return df if df is None else _arrow_text_columns(df)
+
+
+def _read_csv(file_bytes):
+    """Parse CSV bytes with the multi-threaded pyarrow reader where it agrees
+
+    pyarrow rejects ragged rows and files with other delimiters, keeps
+    duplicate header names and reads date-like text as dates; those cases go
+    through the default parser so the table matches what it always produced.
+    """
+    try:
+        df = pd.read_csv(io.BytesIO(file_bytes), engine="pyarrow")
+    except (ImportError, ValueError):
+        return pd.read_csv(io.BytesIO(file_bytes))
+    if df.columns.is_unique and not any(
+        _is_temporal(df[col]) for col in df.columns
+    ):
+        return df
+    return pd.read_csv(io.BytesIO(file_bytes))
+
+
+def _is_temporal(series):
+    """True for date/time columns, which the default CSV parser leaves as text"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return True
+    return series.dtype == object and pd.api.types.infer_dtype(series) in (
+        "date",
+        "datetime",
+        "time",
+    )
+
+
+def _arrow_text_columns(df):
+    """Store all-text object columns (IDs, descriptions) as Arrow strings
+
+    Columns with other values or gaps stay object, so nothing is coerced and
+    missing values keep their meaning; pandas 3 already reads text as
+    Arrow-backed str, leaving nothing to convert.
+    """
+    text_cols = [
+        col
+        for col in df.select_dtypes(include="object").columns
+        if df[col].notna().all() and pd.api.types.infer_dtype(df[col]) == "string"
+    ]
+    if not text_cols:
+        return df
+    return df.astype({col: "string[pyarrow]" for col in text_cols})
+
 
 def create_mapping_section(uploaded_file, config):
     """Create column mapping section and return processed dataframe"""
@@ -22,12 +114,12 @@ def create_mapping_section(uploaded_file, config):
         file_extension = uploaded_file.name.split(".")[-1].lower()
 
         if file_extension == "csv":
-            df = pd.read_csv(uploaded_file)
-            missing_mappings = handle_standard_mapping(df, file_extension)
+            df = _read_tabular_file(uploaded_file.getvalue(), file_extension)
+            df, missing_mappings = handle_standard_mapping(df, file_extension)
 
         elif file_extension in ["xlsx", "xls"]:
-            df = process_excel_file(uploaded_file)
-            missing_mappings = handle_standard_mapping(df, file_extension)
+            df = _read_tabular_file(uploaded_file.getvalue(), file_extension)
+            df, missing_mappings = handle_standard_mapping(df, file_extension)
 
         elif file_extension == "kof":
             df, missing_mappings = handle_kof_mapping(uploaded_file)
@@ -52,63 +144,36 @@ def create_mapping_section(uploaded_file, config):
 def handle_standard_mapping(df, file_extension):
     """Handle column mapping for standard formats (CSV, Excel)"""
     detected_mapping = detect_coordinate_columns(df)
+    # Column labels once, shared by the debug view, dropdowns and tip below
+    columns = tuple(df.columns)
 
     st.subheader("🗺️ Column Mapping")
     st.caption("Map your file columns to N,E,Z coordinate data")
     
     # Debug: Show detected columns
     with st.expander("🔍 Auto-detected columns (debug)"):
-        st.write("Available columns:", list(df.columns))
+        st.write("Available columns:", columns)
         st.write("Detected mapping:", detected_mapping)
 
-    available_columns = [""] + list(df.columns)
-    col_map = {}
-
-    # Create mapping dropdowns
-    col_map["ID"] = st.selectbox(
-        "Point ID Column",
-        available_columns,
-        index=available_columns.index(detected_mapping.get("ID", ""))
-        if detected_mapping.get("ID", "") in available_columns
-        else 0,
-        key=f"id_col_{file_extension}",
-    )
-
-    col_map["N"] = st.selectbox(
-        "N Coordinate (Northing)",
-        available_columns,
-        index=available_columns.index(detected_mapping.get("N", ""))
-        if detected_mapping.get("N", "") in available_columns
-        else 0,
-        key=f"n_col_{file_extension}",
-    )
-
-    col_map["E"] = st.selectbox(
-        "E Coordinate (Easting)",
-        available_columns,
-        index=available_columns.index(detected_mapping.get("E", ""))
-        if detected_mapping.get("E", "") in available_columns
-        else 0,
-        key=f"e_col_{file_extension}",
-    )
+    available_columns = ("",) + columns
+    # First position wins, as list.index did
+    col_index = {}
+    for i, col in enumerate(available_columns):
+        col_index.setdefault(col, i)
+
+    # Create mapping dropdowns; changes are batched until the form is submitted
+    with st.form(f"column_mapping_{file_extension}"):
+        col_map = {
+            field: st.selectbox(
+                label,
+                available_columns,
+                index=col_index.get(detected_mapping.get(field, ""), 0),
+                key=f"{key}_{file_extension}",
+            )
+            for field, label, key in MAPPING_FIELDS
+        }
 
-    col_map["Z"] = st.selectbox(
-        "Z Coordinate (Elevation)",
-        available_columns,
-        index=available_columns.index(detected_mapping.get("Z", ""))
-        if detected_mapping.get("Z", "") in available_columns
-        else 0,
-        key=f"z_col_{file_extension}",
-    )
-
-    col_map["Description"] = st.selectbox(
-        "Description (Optional)",
-        available_columns,
-        index=available_columns.index(detected_mapping.get("Description", ""))
-        if detected_mapping.get("Description", "") in available_columns
-        else 0,
-        key=f"desc_col_{file_extension}",
-    )
+        st.form_submit_button("Apply Mapping")
 
     # Validate required mappings
     required_mappings = ["ID", "N", "E", "Z"]
@@ -118,7 +183,7 @@ def handle_standard_mapping(df, file_extension):
         st.error(
             f"Please map the following required columns: {', '.join(missing_mappings)}"
         )
-        st.info("💡 **Tip**: Your file has these columns: " + ", ".join([f"`{col}`" for col in df.columns if col]))
+        st.info("💡 **Tip**: Your file has these columns: " + ", ".join(f"`{col}`" for col in columns if col))
         
         # Check if auto-detection found something
         detected_but_not_selected = []
@@ -129,35 +194,56 @@ def handle_standard_mapping(df, file_extension):
         if detected_but_not_selected:
             st.warning("🔍 **Auto-detection found these mappings but they weren't selected**: " + ", ".join(detected_but_not_selected))
         
-        return missing_mappings
+        return None, missing_mappings
     else:
         # Apply mapping
-        mapped_df = apply_column_mapping(df, col_map)
-        st.session_state.mapped_df = mapped_df
-        return []
+        # Hand the mapped frame downstream rather than parking a copy in session state
+        return apply_column_mapping(df, col_map), []
+
+
+def _kof_lines(uploaded_file):
+    """Yield decoded lines of an uploaded KOF file without reading it whole"""
+    uploaded_file.seek(0)
+    # Only "\n" ends a line, matching how KOF content was split before
+    text = io.TextIOWrapper(
+        uploaded_file, encoding="utf-8", errors="ignore", newline="\n"
+    )
+    try:
+        # Plain loop: "yield from" would close the wrapper (and the upload)
+        # when the caller stops early
+        for line in text:
+            yield line
+    finally:
+        # Detach so the wrapper doesn't close the upload when it is collected
+        text.detach()
+
+
+def _count_lines(data):
+    """Number of lines _kof_lines yields for ``data``, counted on the raw bytes"""
+    return data.count(b"\n") + bool(data and not data.endswith(b"\n"))
 
 
 def handle_kof_mapping(uploaded_file):
     """Handle KOF file parsing and mapping"""
-    file_content = uploaded_file.read().decode("utf-8", errors="ignore")
-
     st.write("**🔍 Parsing KOF File...**")
     with st.expander("Show file content"):
-        st.code(file_content)
+        preview = list(islice(_kof_lines(uploaded_file), PREVIEW_LINES + 1))
+        if len(preview) > PREVIEW_LINES:
+            total = _count_lines(uploaded_file.getvalue())
+            st.caption(f"{total:,} lines - showing first {PREVIEW_LINES}")
+            st.code("".join(preview[:PREVIEW_LINES]))
+        else:
+            st.code("".join(preview))
 
-    # Parse KOF file
-    parsed_data = smart_parse_kof_file(file_content)
-    st.session_state.parsed_data = parsed_data
+    # Parsed once per upload; reruns for column assignment reuse the table
+    df = _read_tabular_file(uploaded_file.getvalue(), "kof")
 
-    st.write(f"**Found {len(parsed_data)} coordinate lines**")
+    st.write(f"**Found {0 if df is None else len(df)} coordinate lines**")
 
-    if not parsed_data:
+    if df is None:
         st.error("No coordinate data found in KOF file.")
         return None, ["No data found"]
 
-    # Create editable table
-    df = create_editable_coordinate_table(parsed_data)
-
     # Show parsing results
     st.subheader("📊 KOF File Parsing Results")
     st.write(f"Found **{len(df)} coordinate lines** in the file")
@@ -166,37 +252,40 @@ def handle_kof_mapping(uploaded_file):
     st.subheader("🗺️ Coordinate Assignment")
     st.caption("Assign which coordinate column represents N, E, Z")
 
-    if parsed_data:
-        example_line = parsed_data[0]["original_line"]
-        st.info(f"📋 **Example line**: `{example_line}`")
+    example_line = df["Original_Line"].iloc[0]
+    st.info(f"📋 **Example line**: `{example_line}`")
 
-        with st.expander("🔍 Detailed Parsing Breakdown"):
-            st.write("**All numbers found:**", parsed_data[0]["all_numeric"])
-            st.write("**Text values found:**", parsed_data[0]["all_text"])
-            st.write("**Filtered coordinates:**", parsed_data[0]["filtered_coords"])
+    with st.expander("🔍 Detailed Parsing Breakdown"):
+        # Only the example line needs the full per-token breakdown
+        example = next(smart_parse_kof_stream([example_line]))
+        st.write("**All numbers found:**", example["all_numeric"])
+        st.write("**Text values found:**", example["all_text"])
+        st.write("**Filtered coordinates:**", example["filtered_coords"])
 
     # Column assignment
     available_coord_cols = [col for col in df.columns if col.startswith("Coord")]
 
-    coord_cols = st.columns(3)
-    with coord_cols[0]:
-        n_source = st.selectbox(
-            "Northing (N):", available_coord_cols, index=0, key="n_assign"
-        )
-    with coord_cols[1]:
-        e_source = st.selectbox(
-            "Easting (E):",
-            available_coord_cols,
-            index=1 if len(available_coord_cols) > 1 else 0,
-            key="e_assign",
-        )
-    with coord_cols[2]:
-        z_source = st.selectbox(
-            "Elevation (Z):",
-            available_coord_cols,
-            index=2 if len(available_coord_cols) > 2 else 0,
-            key="z_assign",
-        )
+    with st.form("kof_assignment"):
+        coord_cols = st.columns(3)
+        with coord_cols[0]:
+            n_source = st.selectbox(
+                "Northing (N):", available_coord_cols, index=0, key="n_assign"
+            )
+        with coord_cols[1]:
+            e_source = st.selectbox(
+                "Easting (E):",
+                available_coord_cols,
+                index=1 if len(available_coord_cols) > 1 else 0,
+                key="e_assign",
+            )
+        with coord_cols[2]:
+            z_source = st.selectbox(
+                "Elevation (Z):",
+                available_coord_cols,
+                index=2 if len(available_coord_cols) > 2 else 0,
+                key="z_assign",
+            )
+        st.form_submit_button("Apply Assignment")
 
     # Check for duplicates
     assignments = [n_source, e_source, z_source]
@@ -207,35 +296,32 @@ def handle_kof_mapping(uploaded_file):
 
     # Create mapped dataframe
     try:
-        mapped_df = df.copy()
-        mapped_df["N"] = df[n_source] if n_source else 0.0
-        mapped_df["E"] = df[e_source] if e_source else 0.0
-        mapped_df["Z"] = df[z_source] if z_source else 0.0
-
-        # Ensure required columns
-        if "ID" not in mapped_df.columns:
-            mapped_df["ID"] = [f"P{i + 1}" for i in range(len(mapped_df))]
-        if "Description" not in mapped_df.columns:
-            mapped_df["Description"] = ""
+        # Only the edited columns, sharing the parsed arrays instead of copying
+        # the whole table; one source may feed several coordinates
+        mapped_df = pd.DataFrame(
+            {
+                "ID": df["ID"]
+                if "ID" in df.columns
+                else [f"P{i + 1}" for i in range(len(df))],
+                "N": df[n_source] if n_source else 0.0,
+                "E": df[e_source] if e_source else 0.0,
+                "Z": df[z_source] if z_source else 0.0,
+                "Description": df["Description"] if "Description" in df.columns else "",
+            },
+            index=df.index,
+            copy=False,
+        )
 
         # Show editable table
         st.subheader("✏️ Edit Coordinate Data")
-        required_cols = ["ID", "N", "E", "Z", "Description"]
 
         edited_df = st.data_editor(
-            mapped_df[required_cols].copy(),
+            mapped_df,
             use_container_width=True,
             num_rows="dynamic",
-            column_config={
-                "ID": st.column_config.TextColumn("Point ID", required=True),
-                "N": st.column_config.NumberColumn("N (Northing)", format="%.3f"),
-                "E": st.column_config.NumberColumn("E (Easting)", format="%.3f"),
-                "Z": st.column_config.NumberColumn("Z (Elevation)", format="%.3f"),
-                "Description": st.column_config.TextColumn("Description"),
-            },
+            column_config=KOF_EDITOR_COLUMNS,
         )
 
-        st.session_state.mapped_df = edited_df
         return edited_df, []
 
     except Exception as e:
@@ -243,10 +329,34 @@ def handle_kof_mapping(uploaded_file):
         return None, [str(e)]
 
 
+def _hash_coordinates(coords):
+    """Full content hash of the N/E/Z block; Streamlit samples large frames"""
+    return (
+        tuple(coords.columns),
+        tuple(map(str, coords.dtypes)),
+        pd.util.hash_pandas_object(coords, index=False).to_numpy().tobytes(),
+    )
+
+
+@st.cache_data(
+    show_spinner=False,
+    max_entries=32,
+    hash_funcs={pd.DataFrame: _hash_coordinates},
+)
+def _check_coordinates(coords):
+    """Validate the N/E/Z block and detect its units, cached on its values"""
+    errors, warnings = CoordinateValidator.validate_coordinates(coords)
+    detected_units = None if errors else CoordinateValidator.detect_units(coords)
+    return errors, warnings, detected_units
+
+
 def validate_and_process_coordinates(df, config, uploaded_file, file_extension):
     """Validate coordinates and apply transformations"""
-    validator = CoordinateValidator()
-    errors, warnings = validator.validate_coordinates(df)
+    # Both checks read only N/E/Z, so reruns with unchanged coordinates
+    # (edited IDs, sidebar tweaks) reuse the previous results
+    errors, warnings, detected_units = _check_coordinates(
+        df[[col for col in ("N", "E", "Z") if col in df.columns]]
+    )
 
     if errors:
         st.error("❌ **Coordinate Validation Errors:**")
@@ -256,7 +366,6 @@ def validate_and_process_coordinates(df, config, uploaded_file, file_extension):
 
     # Unit detection and conversion
     if config["auto_detect_units"]:
-        detected_units = validator.detect_units(df)
         st.info(f"🔍 **Detected Units**: {detected_units}")
 
         if detected_units != config["unit_code"]:
@@ -283,54 +392,55 @@ def validate_and_process_coordinates(df, config, uploaded_file, file_extension):
     else:
         working_units = config["unit_code"]
 
-    # Convert to meters for IFC
+    # Create survey processor
+    processor = SurveyProcessor(
+        config["coord_system"],
+        config["basepoint_n"],
+        config["basepoint_e"],
+        config["basepoint_z"],
+    )
+
+    # Convert to meters for IFC and apply the coordinate transformation in a
+    # single pass; frames are shared when nothing changes, so treat as read-only
     if working_units != "m":
         st.info(f"🔄 **Converting** from {working_units} to meters for IFC")
-        df_meters = validator.convert_units(df, working_units, "m")
+        factor = CONVERSION_FACTORS.get((working_units, "m"))
+        if factor is None:
+            raise ValueError(f"Conversion from {working_units} to m not supported")
         conversion_note = f" (converted from {working_units})"
     else:
-        df_meters = df.copy()
+        factor = 1.0
         conversion_note = ""
+    # Convert text columns once, before both frames are derived, so the IFC
+    # names and the verification IDs see the same values
+    df = _arrow_text_columns(df)
+    df_meters, transformed_df = processor.convert_and_transform(df, factor)
 
     # Show coordinate sample
     st.info("📋 **Coordinate Sample** (in meters for IFC):")
     sample_coords = df_meters[["N", "E", "Z"]].head(3)
-    for idx, row in sample_coords.iterrows():
-        st.write(
-            f"Point {idx + 1}: N={row['N']:.3f}m, E={row['E']:.3f}m, Z={row['Z']:.3f}m"
-        )
+    st.dataframe(
+        sample_coords.set_axis([f"Point {idx + 1}" for idx in sample_coords.index]),
+        column_config=SAMPLE_COLUMNS,
+        use_container_width=True,
+    )
 
     if warnings:
         st.warning("⚠️ **Coordinate Validation Warnings:**")
         for warning in warnings:
             st.warning(f"• {warning}")
 
-    # Create survey processor
-    processor = SurveyProcessor(
-        config["coord_system"],
-        config["basepoint_n"],
-        config["basepoint_e"],
-        config["basepoint_z"],
-    )
-
     # Calculate north direction
     if len(df_meters) >= 3:
         calculated_north = processor.calculate_north_direction(df_meters)
-        if SKLEARN_AVAILABLE:
-            st.info(
-                f"🧭 **Calculated Grid North**: {calculated_north:.2f}° from east (PCA method)"
-            )
-        else:
-            st.info(
-                f"🧭 **Estimated Grid North**: {calculated_north:.2f}° from east (basic method)"
-            )
+        st.info(
+            f"🧭 **Calculated Grid North**: {calculated_north:.2f}° from east (PCA method)"
+        )
 
-    # Apply coordinate transformation
+    # Describe the applied coordinate transformation
     if config["coord_system"] == "Local" or config["use_basepoint"]:
-        transformed_df = processor.transform_coordinates(df_meters)
         coord_note = f" (offset by basepoint: N={config['basepoint_n']:.3f}, E={config['basepoint_e']:.3f}, Z={config['basepoint_z']:.3f})"
     else:
-        transformed_df = df_meters.copy()
         coord_note = " (global coordinates)"
 
     # Show preview
@@ -371,19 +481,16 @@ def validate_and_process_coordinates(df, config, uploaded_file, file_extension):
 
     # Coordinate system info
     try:
-        if (
-            pd.api.types.is_numeric_dtype(transformed_df["N"])
-            and pd.api.types.is_numeric_dtype(transformed_df["E"])
-            and pd.api.types.is_numeric_dtype(transformed_df["Z"])
-        ):
-            n_range = (
-                f"{transformed_df['N'].min():.2f} to {transformed_df['N'].max():.2f}"
-            )
-            e_range = (
-                f"{transformed_df['E'].min():.2f} to {transformed_df['E'].max():.2f}"
-            )
-            z_range = (
-                f"{transformed_df['Z'].min():.2f} to {transformed_df['Z'].max():.2f}"
+        # One min and one max reduction over the N/E/Z block; NaN propagates
+        # into the extremes, so checking those six values covers the array
+        coords = transformed_df[["N", "E", "Z"]].to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        mins = coords.min(axis=0)
+        maxs = coords.max(axis=0)
+        if np.isfinite(mins).all() and np.isfinite(maxs).all():
+            n_range, e_range, z_range = (
+                f"{lo:.2f} to {hi:.2f}" for lo, hi in zip(mins.tolist(), maxs.tolist())
             )
             st.info(
                 f"📍 **{config['coord_system']} Coordinate Ranges** (meters){coord_note}\nN: {n_range}m\nE: {e_range}m\nZ: {z_range}m"
@@ -392,7 +499,6 @@ def validate_and_process_coordinates(df, config, uploaded_file, file_extension):
         st.warning(f"Could not calculate coordinate ranges: {str(e)}")
 
     # Store processed data
-    st.session_state.transformed_df = transformed_df
     st.session_state.df_meters = df_meters
     st.session_state.working_units = working_units
     st.session_state.conversion_note = conversion_note
@@ -1,15 +1,67 @@
 """Enhanced sidebar configuration UI with all features"""
 
+import pandas as pd
 import streamlit as st
 
+LANGUAGE_FLAGS = {"EN": "🇬🇧", "NO": "🇳🇴"}
+MSG_SOON_NO = "Norsk oversettelse kommer snart!"
+CUSTOM_PROPERTY_COLUMNS = {
+    "name": st.column_config.TextColumn("Property Name"),
+    "value": st.column_config.TextColumn("Property Value"),
+}
+
+
+def _property_editor_key():
+    """Widget key of the custom properties editor for the current table"""
+    version = st.session_state.get("custom_properties_version", 0)
+    return f"custom_properties_editor_{version}"
+
+
+def _bump_property_editor():
+    """Start a fresh editor on the next run, without the old widget edits"""
+    ss = st.session_state
+    ss.custom_properties_version = ss.get("custom_properties_version", 0) + 1
+
+
+def _store_property_edits(editor_key):
+    """Fold the editor's edited, deleted and added rows into ss.custom_properties"""
+    ss = st.session_state
+    changes = ss[editor_key]
+    rows = [dict(prop) for prop in ss.custom_properties]
+    for index, values in changes["edited_rows"].items():
+        rows[int(index)].update(values)
+    deleted = set(changes["deleted_rows"])
+    rows = [row for index, row in enumerate(rows) if index not in deleted]
+    rows.extend(
+        {"name": added.get("name"), "value": added.get("value")}
+        for added in changes["added_rows"]
+    )
+    ss.custom_properties = rows
+    # The edits now live in the base table, so the editor starts over from it
+    _bump_property_editor()
+
 
 def create_sidebar():
     """Create and return sidebar configuration"""
+    ss = st.session_state
     with st.sidebar:
-        st.header("⚙️ Project Settings")
-
         config = {}
 
+        # Language selector
+        config["lang"] = st.radio(
+            "Language",
+            list(LANGUAGE_FLAGS),
+            index=0,
+            format_func=LANGUAGE_FLAGS.get,
+            horizontal=True,
+            label_visibility="collapsed",
+            key="lang",
+        )
+        if config["lang"] == "NO":
+            st.info(MSG_SOON_NO)
+
+        st.header("⚙️ Project Settings")
+
         # Project settings
         config["project_name"] = st.text_input("Project Name", key="project_name")
         config["site_name"] = st.text_input("Site Name", key="site_name")
@@ -21,7 +73,7 @@ def create_sidebar():
         config["coord_system"] = st.radio(
             "Coordinate System Type",
             options=["Local", "Global/Geographic"],
-            index=0 if st.session_state.coord_system == "Local" else 1,
+            index=0 if ss.coord_system == "Local" else 1,
             help="Local coordinates use project basepoint offsets",
             key="coord_system",
         )
@@ -193,58 +245,33 @@ def create_sidebar():
         st.caption("Add custom properties to survey points")
 
         # Initialize custom properties
-        if "custom_properties" not in st.session_state:
-            st.session_state.custom_properties = [
+        if "custom_properties" not in ss:
+            ss.custom_properties = [
                 {"name": "Coordinate_System", "value": "EUREF89_NTM10"},
                 {"name": "Survey_Method", "value": "Total_Station"},
                 {"name": "Accuracy_Class", "value": "Class_1"},
             ]
 
-        # Add new property form
-        with st.form("add_property_form", clear_on_submit=True):
-            col1, col2, col3 = st.columns([2, 2, 1])
-            with col1:
-                new_prop_name = st.text_input("Property Name")
-            with col2:
-                new_prop_value = st.text_input("Property Value")
-            with col3:
-                submitted = st.form_submit_button("➕ Add")
-
-            if submitted and new_prop_name and new_prop_value:
-                st.session_state.custom_properties.append(
-                    {"name": new_prop_name, "value": new_prop_value}
-                )
-                st.success(f"Added property: {new_prop_name}")
-                st.session_state.preserve_file_state = True
-                st.rerun()
-
-        # Display existing properties
-        if st.session_state.custom_properties:
-            properties_to_remove = []
-            for i, prop in enumerate(st.session_state.custom_properties):
-                col1, col2, col3 = st.columns([2, 2, 1])
-                with col1:
-                    prop["name"] = st.text_input(
-                        f"Name {i + 1}", value=prop["name"], key=f"edit_prop_name_{i}"
-                    )
-                with col2:
-                    prop["value"] = st.text_input(
-                        f"Value {i + 1}",
-                        value=prop["value"],
-                        key=f"edit_prop_value_{i}",
-                    )
-                with col3:
-                    if st.button("🗑️", key=f"remove_{i}", help="Remove property"):
-                        properties_to_remove.append(i)
-
-            # Remove marked properties
-            if properties_to_remove:
-                for i in reversed(properties_to_remove):
-                    st.session_state.custom_properties.pop(i)
-                st.session_state.preserve_file_state = True
-                st.rerun()
-
-        config["custom_properties"] = st.session_state.custom_properties
+        # One editable table for all properties; rows can be added, edited
+        # and deleted in place. Each change is folded into
+        # ss.custom_properties, which stays the source of truth
+        editor_key = _property_editor_key()
+        st.data_editor(
+            pd.DataFrame(ss.custom_properties, columns=["name", "value"]),
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            column_config=CUSTOM_PROPERTY_COLUMNS,
+            key=editor_key,
+            on_change=_store_property_edits,
+            args=(editor_key,),
+        )
+        # Rows still missing a name or value are kept for editing but not used
+        config["custom_properties"] = [
+            {"name": prop["name"], "value": prop["value"]}
+            for prop in ss.custom_properties
+            if prop.get("name") and prop.get("value")
+        ]
 
         # Verification settings
         st.subheader("✅ Coordinate Verification")
@@ -275,10 +302,19 @@ def create_sidebar():
                     "creator_name",
                     "marker_color",
                     "pset_name",
+                    "custom_properties",
                 ]
                 for key in keys_to_reset:
-                    if key in st.session_state:
-                        del st.session_state[key]
+                    if key in ss:
+                        del ss[key]
+                # A new editor key drops the table's pending edits too
+                _bump_property_editor()
                 st.rerun()
 
+    # Hand back the previous dict while no setting changed, so downstream
+    # code sees an identity-stable config across reruns
+    previous = ss.get("sidebar_config")
+    if previous == config:
+        return previous
+    ss.sidebar_config = config
     return config
@@ -6,6 +6,12 @@ from ..config import SUPPORTED_FORMATS
 from ..utils.templates import create_excel_template, EXCEL_SUPPORT
 
 
+@st.cache_resource(show_spinner=False)
+def _excel_template():
+    """Build the Excel template once per process; its bytes never change"""
+    return create_excel_template()
+
+
 def create_upload_section():
     """Create file upload section and return uploaded file"""
     st.header("📤 Upload Survey Data")
@@ -24,9 +30,8 @@ def create_upload_section():
         if st.button("🗑️ Clear uploaded file", key="clear_file"):
             st.session_state.uploaded_file_data = None
             st.session_state.uploaded_file_name = None
-            st.session_state.parsed_data = None
-            st.session_state.mapped_df = None
-            st.session_state.transformed_df = None
+            st.session_state.df_meters = None
+            st.session_state.pop("ifc_result", None)
             st.rerun()
 
         # Return the stored file as a file-like object
@@ -58,7 +63,7 @@ def create_upload_section():
     )
 
     if EXCEL_SUPPORT:
-        template_file = create_excel_template()
+        template_file = _excel_template()
         if template_file:
             st.download_button(
                 label="📥 Download Excel Template",
@@ -1,34 +1,51 @@
 """Session state management for Streamlit with enhanced persistence"""
 
+import copy
+from types import MappingProxyType
+
 import streamlit as st
 from ..config import DEFAULTS
 
+# st.fragment only exists on newer Streamlit releases (experimental_fragment
+# before 1.37); on older versions the decorated function simply runs inline
+fragment = (
+    getattr(st, "fragment", None)
+    or getattr(st, "experimental_fragment", None)
+    or (lambda func: func)
+)
+
+# Read-only defaults for every session key, including file persistence keys
+_DEFAULTS = MappingProxyType(
+    {
+        **DEFAULTS,
+        "uploaded_file_data": None,
+        "uploaded_file_name": None,
+        "uploaded_file_type": None,
+        "preserve_file_state": False,
+    }
+)
+
+# Legacy hex marker colours and the names that replaced them
+_HEX_TO_NAME = MappingProxyType(
+    {
+        "#FF0000": "Red",
+        "#FF00FF": "Magenta",
+        "#008080": "Teal",
+        "#808080": "Gray",
+        "#FFFF00": "Yellow",
+    }
+)
+
 
 def initialize_session_state():
     """Initialize session state with default values"""
+    ss = st.session_state
+
     # Handle legacy color format conversion
-    if "marker_color" in st.session_state:
-        # Convert hex colors to names if needed
-        hex_to_name = {
-            "#FF0000": "Red",
-            "#FF00FF": "Magenta",
-            "#008080": "Teal",
-            "#808080": "Gray",
-            "#FFFF00": "Yellow",
-        }
-        if st.session_state.marker_color in hex_to_name:
-            st.session_state.marker_color = hex_to_name[st.session_state.marker_color]
-
-    for key, default_value in DEFAULTS.items():
-        if key not in st.session_state:
-            st.session_state[key] = default_value
-
-    # Add file persistence keys
-    if "uploaded_file_data" not in st.session_state:
-        st.session_state.uploaded_file_data = None
-    if "uploaded_file_name" not in st.session_state:
-        st.session_state.uploaded_file_name = None
-    if "uploaded_file_type" not in st.session_state:
-        st.session_state.uploaded_file_type = None
-    if "preserve_file_state" not in st.session_state:
-        st.session_state.preserve_file_state = False
+    if ss.get("marker_color") in _HEX_TO_NAME:
+        ss.marker_color = _HEX_TO_NAME[ss.marker_color]
+
+    missing = _DEFAULTS.keys() - ss.keys()
+    if missing:
+        # Deep copy so sessions never share mutable defaults like custom_properties
+        ss.update({k: copy.deepcopy(_DEFAULTS[k]) for k in missing})
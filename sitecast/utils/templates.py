@@ -6,6 +6,7 @@ import io
 # Check if openpyxl is available
 try:
     import openpyxl
+    from openpyxl.utils import get_column_letter
 
     EXCEL_SUPPORT = True
 except ImportError:
@@ -41,72 +42,65 @@ def create_excel_template():
         "Accuracy_mm": [5, 5, 5, 2, 2],
     }
 
-    df = pd.DataFrame(template_data)
+    instructions = [
+        "1. Fill out the Survey_Points sheet with your coordinate data",
+        "2. Required columns: ID, N_Northing, E_Easting, Z_Elevation",
+        "3. Optional columns: Description, Type, Date_Surveyed, Accuracy_mm",
+        "4. You can add more rows as needed",
+        "5. Keep column headers exactly as shown",
+        "6. Use consistent coordinate system (UTM recommended)",
+        "7. Save and upload the completed file to SiteCast",
+        "",
+        "Column Descriptions:",
+        "ID - Unique point identifier",
+        "N_Northing - Northing coordinate in meters",
+        "E_Easting - Easting coordinate in meters",
+        "Z_Elevation - Elevation in meters",
+        "Description - Point description or notes",
+        "Type - Point type (Survey, Control, Benchmark, etc.)",
+        "Date_Surveyed - Date when point was surveyed",
+        "Accuracy_mm - Survey accuracy in millimeters",
+        "",
+        "NOTE: Coordinate order is N,E,Z (North, East, Elevation)",
+    ]
+
     output = io.BytesIO()
 
     try:
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            # Write the template data
-            df.to_excel(writer, sheet_name="Survey_Points", index=False)
-
-            # Add instructions sheet
-            instructions = pd.DataFrame(
-                {
-                    "Instructions": [
-                        "1. Fill out the Survey_Points sheet with your coordinate data",
-                        "2. Required columns: ID, N_Northing, E_Easting, Z_Elevation",
-                        "3. Optional columns: Description, Type, Date_Surveyed, Accuracy_mm",
-                        "4. You can add more rows as needed",
-                        "5. Keep column headers exactly as shown",
-                        "6. Use consistent coordinate system (UTM recommended)",
-                        "7. Save and upload the completed file to SiteCast",
-                        "",
-                        "Column Descriptions:",
-                        "ID - Unique point identifier",
-                        "N_Northing - Northing coordinate in meters",
-                        "E_Easting - Easting coordinate in meters",
-                        "Z_Elevation - Elevation in meters",
-                        "Description - Point description or notes",
-                        "Type - Point type (Survey, Control, Benchmark, etc.)",
-                        "Date_Surveyed - Date when point was surveyed",
-                        "Accuracy_mm - Survey accuracy in millimeters",
-                        "",
-                        "NOTE: Coordinate order is N,E,Z (North, East, Elevation)",
-                    ]
-                }
-            )
-            instructions.to_excel(writer, sheet_name="Instructions", index=False)
-
-            # Format the Survey_Points sheet
-            workbook = writer.book
-            worksheet = writer.sheets["Survey_Points"]
-
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 20)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        # Write-only mode streams rows straight to XML
+        workbook = openpyxl.Workbook(write_only=True)
+
+        # Survey_Points sheet; widths must be set before any rows are written
+        worksheet = workbook.create_sheet("Survey_Points")
+        for i, (name, values) in enumerate(template_data.items(), start=1):
+            max_length = max(len(str(v)) for v in (name, *values))
+            adjusted_width = min(max_length + 2, 20)
+            worksheet.column_dimensions[get_column_letter(i)].width = adjusted_width
+
+        worksheet.append(list(template_data))
+        for row in zip(*template_data.values()):
+            worksheet.append(row)
+
+        # Add instructions sheet
+        worksheet = workbook.create_sheet("Instructions")
+        worksheet.append(["Instructions"])
+        for line in instructions:
+            worksheet.append([line or None])
 
+        workbook.save(output)
         output.seek(0)
         return output.getvalue()
     except Exception:
         return None
 
 
-def process_excel_file(uploaded_file):
-    """Process uploaded Excel file"""
+def process_excel_file(uploaded_file, engine=None):
+    """Process uploaded Excel file; pass engine to skip format probing"""
     if not EXCEL_SUPPORT:
         raise Exception("Excel support not available. Install openpyxl")
 
     try:
-        df = pd.read_excel(uploaded_file, sheet_name=0)
+        df = pd.read_excel(uploaded_file, sheet_name=0, engine=engine)
         return df
     except Exception as e:
         raise Exception(f"Error reading Excel file: {str(e)}")
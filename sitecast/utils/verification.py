@@ -1,7 +1,8 @@
 """Coordinate verification utilities"""
 
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 try:
     import ifcopenshell
@@ -11,115 +12,130 @@ except ImportError:
 
 
 def verify_ifc_coordinates(
-    ifc_path: str, original_df: pd.DataFrame, offsets: Dict[str, float]
-) -> List[Dict[str, Any]]:
-    """Verify that IFC coordinates match expected values"""
+    ifc_path, original_df: pd.DataFrame, offsets: Dict[str, float]
+) -> Union[pd.DataFrame, str]:
+    """Verify that IFC coordinates match expected values
+
+    ifc_path may be a path on disk or an already loaded ifcopenshell.file.
+    Returns one row per point (see _results_frame), or an error message.
+    """
     if not USE_IFCOPENSHELL:
         return verify_ifc_coordinates_simple(ifc_path, original_df, offsets)
         
     try:
-        # Original ifcopenshell implementation
-        ifc_file = ifcopenshell.open(ifc_path)
-        results = []
-
-        # Get all annotations (survey points)
-        annotations = ifc_file.by_type("IfcAnnotation")
-
-        for idx, row in original_df.iterrows():
-            point_id = str(row.get("ID", f"Unknown_{idx}"))
-            expected_n = float(row["N"]) - offsets["N"]
-            expected_e = float(row["E"]) - offsets["E"]
-            expected_z = float(row["Z"]) - offsets["Z"]
-
-            # Find matching annotation
-            found = False
-            for annotation in annotations:
-                if point_id in str(annotation.Name):
-                    # Get placement
-                    if annotation.ObjectPlacement:
-                        placement = annotation.ObjectPlacement
-                        if placement.RelativePlacement:
-                            location = placement.RelativePlacement.Location
-                            if location:
-                                coords = location.Coordinates
-                                if coords and len(coords) == 3:
-                                    ifc_e, ifc_n, ifc_z = coords
-                                    
-                                    # Check if coordinates match (within tolerance)
-                                    tolerance = 0.001  # 1mm
-                                    n_match = abs(ifc_n - expected_n) < tolerance
-                                    e_match = abs(ifc_e - expected_e) < tolerance
-                                    z_match = abs(ifc_z - expected_z) < tolerance
-                                    
-                                    results.append({
-                                        "point_id": point_id,
-                                        "expected": {"N": expected_n, "E": expected_e, "Z": expected_z},
-                                        "found": {"N": ifc_n, "E": ifc_e, "Z": ifc_z},
-                                        "matches": {"N": n_match, "E": e_match, "Z": z_match},
-                                        "all_match": n_match and e_match and z_match,
-                                    })
-                                    found = True
-                                    break
-
-            if not found:
-                results.append({
-                    "point_id": point_id,
-                    "expected": {"N": expected_n, "E": expected_e, "Z": expected_z},
-                    "found": None,
-                    "matches": {"N": False, "E": False, "Z": False},
-                    "all_match": False,
-                })
-
-        return results
+        if isinstance(ifc_path, ifcopenshell.file):
+            ifc_file = ifc_path
+        else:
+            ifc_file = ifcopenshell.open(ifc_path)
+
+        # Read every annotation's placement in one pass into an (M, 3) N/E/Z
+        # table, indexed by name (first one wins); NaN where there is none
+        row_by_name = {}
+        placements = []
+        for annotation in ifc_file.by_type("IfcAnnotation"):
+            name = str(annotation.Name)
+            if name not in row_by_name:
+                row_by_name[name] = len(placements)
+                coords = _annotation_coordinates(annotation)
+                placements.append(coords if coords is not None else (np.nan,) * 3)
+        table = np.array(placements, dtype=float).reshape(-1, 3)[:, [1, 0, 2]]
+
+        point_ids = _point_ids(original_df)
+        offset = np.array([offsets["N"], offsets["E"], offsets["Z"]], dtype=float)
+        original = original_df[["N", "E", "Z"]].to_numpy(dtype=float)
+        expected = original - offset
+
+        # Gather each point's placement from the table by row index
+        rows = np.array([row_by_name.get(pid, -1) for pid in point_ids], dtype=np.intp)
+        found = np.full(expected.shape, np.nan)
+        hit = rows >= 0
+        found[hit] = table[rows[hit]]
+
+        # Check all coordinates against the tolerance in one pass
+        tolerance = 0.001  # 1mm
+        matches = np.abs(found - expected) < tolerance
+
+        return _results_frame(point_ids, original, expected, found, offset, matches)
 
     except Exception as e:
         return f"Error during verification: {str(e)}"
 
 
+def _point_ids(original_df: pd.DataFrame) -> List[str]:
+    """Point IDs as the names used for the IFC annotations"""
+    if "ID" in original_df.columns:
+        return [str(v) for v in original_df["ID"]]
+    return [f"Unknown_{idx}" for idx in original_df.index]
+
+
+def _results_frame(point_ids, original, expected, found, offset, matches):
+    """Collect verification arrays into one DataFrame, one row per point
+
+    Columns: point_id; original_*, expected_*, found_* and calculated_* for
+    each of N/E/Z (found/calculated are NaN when the point has no placement);
+    match_N/E/Z and all_match booleans.
+    """
+    columns = {"point_id": point_ids}
+    for prefix, values in (
+        ("original", original),
+        ("expected", expected),
+        ("found", found),
+        ("calculated", found + offset),
+    ):
+        for i, axis in enumerate("NEZ"):
+            columns[f"{prefix}_{axis}"] = values[:, i]
+    for i, axis in enumerate("NEZ"):
+        columns[f"match_{axis}"] = matches[:, i]
+    columns["all_match"] = matches.all(axis=1)
+    return pd.DataFrame(columns)
+
+
+def _annotation_coordinates(annotation) -> Optional[Tuple[float, float, float]]:
+    """Return the (E, N, Z) placement of an annotation, or None"""
+    if annotation is None or not annotation.ObjectPlacement:
+        return None
+    placement = annotation.ObjectPlacement
+    if not placement.RelativePlacement:
+        return None
+    location = placement.RelativePlacement.Location
+    if not location:
+        return None
+    coords = location.Coordinates
+    if coords and len(coords) == 3:
+        return coords
+    return None
+
+
 def verify_ifc_coordinates_simple(
     ifc_path: str, original_df: pd.DataFrame, offsets: Dict[str, float]
-) -> List[Dict[str, Any]]:
+) -> Union[pd.DataFrame, str]:
     """Simple verification by parsing IFC text file"""
     try:
-        results = []
-        
         # Read IFC file as text
         with open(ifc_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # For each point in original data
-        for idx, row in original_df.iterrows():
-            point_id = str(row.get("ID", f"Unknown_{idx}"))
-            expected_n = float(row["N"]) - offsets["N"]
-            expected_e = float(row["E"]) - offsets["E"]
-            expected_z = float(row["Z"]) - offsets["Z"]
-            
-            # Simple check - look for the point ID and nearby coordinates
-            found = False
-            if f"Survey Point {point_id}" in content:
-                # Try to find coordinates near this point mention
-                # This is a simplified check
-                coord_str = f"{expected_e:.3f},{expected_n:.3f},{expected_z:.3f}"
-                if coord_str in content:
-                    found = True
-                    results.append({
-                        "point_id": point_id,
-                        "expected": {"N": expected_n, "E": expected_e, "Z": expected_z},
-                        "found": {"N": expected_n, "E": expected_e, "Z": expected_z},
-                        "matches": {"N": True, "E": True, "Z": True},
-                        "all_match": True,
-                    })
-            
-            if not found:
-                results.append({
-                    "point_id": point_id,
-                    "expected": {"N": expected_n, "E": expected_e, "Z": expected_z},
-                    "found": None,
-                    "matches": {"N": False, "E": False, "Z": False},
-                    "all_match": False,
-                })
-        
-        return results
+        point_ids = _point_ids(original_df)
+        offset = np.array([offsets["N"], offsets["E"], offsets["Z"]], dtype=float)
+        original = original_df[["N", "E", "Z"]].to_numpy(dtype=float)
+        expected = original - offset
+
+        # Simple check - look for the point ID and its coordinates
+        # This is a simplified check
+        found_points = np.array(
+            [
+                f"Survey Point {point_id}" in content
+                and f"{expected_e:.3f},{expected_n:.3f},{expected_z:.3f}" in content
+                for point_id, (expected_n, expected_e, expected_z) in zip(
+                    point_ids, expected.tolist()
+                )
+            ],
+            dtype=bool,
+        ).reshape(-1, 1)
+        found = np.where(found_points, expected, np.nan)
+        matches = np.repeat(found_points, 3, axis=1)
+
+        return _results_frame(point_ids, original, expected, found, offset, matches)
         
     except Exception as e:
-        return f"Error during verification: {str(e)}"
\ No newline at end of file
+        return f"Error during verification: {str(e)}"
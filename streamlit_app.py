@@ -2,7 +2,9 @@
 Alternative entry point for Streamlit Cloud
 This file helps Streamlit Cloud detect the app
 """
-from main import main
+import streamlit as st
+from main import main, PAGE_CONFIG
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    st.set_page_config(**PAGE_CONFIG)
+    main()
\ No newline at end of file